@@ -4,6 +4,16 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
+import os
+from figure_cache import FigureCache
+from jonah_market_data import (
+    build_market_cube, first_matches, load_market_data, market_map_arrays, prepare_market_frame,
+    select_cells, summarize_cells
+)
+
+# Row-level views are capped so a multi-million-row export stays usable
+PARTNERSHIP_TABLE_ROWS = 500
+ACHIEVEMENT_EXPANDERS = 20
 
 # Page configuration
 st.set_page_config(
@@ -44,8 +54,14 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Load and prepare data
-@st.cache_data
+# cache_resource shares one frame instead of copying it on every rerun
+@st.cache_resource
 def load_data():
+    # Point JONAH_MARKET_DATA at an Arrow file built with jonah_market_data.ingest_market_export
+    export_path = os.environ.get('JONAH_MARKET_DATA')
+    if export_path:
+        return load_market_data(export_path)
+    
     # Sample data based on the CSV structure
     data = {
         'Market Region': ['UK', 'UK', 'France', 'France', 'Caribbean'],
@@ -73,16 +89,23 @@ def load_data():
         ]
     }
     
-    df = pd.DataFrame(data)
-    
-    # Clean and convert data
-    df['Client Retention Rate'] = df['Client Retention Rate'].str.rstrip('%').astype(float)
-    df['Partner Count'] = df['Strategic Partners'].str.count(';') + 1
-    df['Achievement Count'] = df['Key Achievements'].str.count(';') + 1
-    
-    return df
+    return prepare_market_frame(pd.DataFrame(data))
+
+@st.cache_resource
+def load_market_cube():
+    """Pre-aggregated (region × type) cube backing the summary and regional cards"""
+    return build_market_cube(load_data())
+
+@st.cache_resource
+def get_figure_cache():
+    """Process-wide Plotly figure cache shared by every session"""
+    return FigureCache(maxsize=64)
 
 df = load_data()
+cube = load_market_cube()
+figure_cache = get_figure_cache()
+region_options = cube.index.get_level_values('Market Region').unique()
+type_options = cube.index.get_level_values('Market Type').unique()
 
 # Header
 st.title("🚀 Jonah.Works Performance Dashboard 2019 - 2024, All Rights Reserved")
@@ -92,28 +115,40 @@ st.markdown("*Director's Executive View - Real-time Business Intelligence*")
 st.sidebar.header("📊 Dashboard Filters")
 selected_regions = st.sidebar.multiselect(
     "Select Market Regions",
-    options=df['Market Region'].unique(),
-    default=df['Market Region'].unique()
+    options=region_options,
+    default=region_options
 )
 
 selected_types = st.sidebar.multiselect(
     "Select Market Types",
-    options=df['Market Type'].unique(),
-    default=df['Market Type'].unique()
+    options=type_options,
+    default=type_options
 )
 
-# Filter data
-filtered_df = df[
-    (df['Market Region'].isin(selected_regions)) & 
-    (df['Market Type'].isin(selected_types))
-]
+# Filter data: cards come from the cube; row-level filtering waits for a figure-cache miss
+_selection = {}
+
+def selected_markets():
+    """Rows in the sidebar selection, filtered at most once per rerun"""
+    if 'rows' not in _selection:
+        _selection['rows'] = df[
+            (df['Market Region'].isin(selected_regions)) &
+            (df['Market Type'].isin(selected_types))
+        ]
+    return _selection['rows']
+
+selected_cells = select_cells(cube, selected_regions, selected_types)
+summary = summarize_cells(selected_cells)
+
+# Charts depend only on the data and the selection, so key the figure cache on those
+chart_inputs = (cube, tuple(selected_regions), tuple(selected_types))
 
 # Key Metrics Row
 st.header("📈 Executive Summary")
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    total_revenue = filtered_df['Monthly Recurring Revenue (GBP)'].sum()
+    total_revenue = summary['revenue']
     st.markdown(f"""
     <div class="metric-card revenue-metric">
         <h3>£{total_revenue:,}</h3>
@@ -122,7 +157,7 @@ with col1:
     """, unsafe_allow_html=True)
 
 with col2:
-    avg_retention = filtered_df['Client Retention Rate'].mean()
+    avg_retention = summary['avg_retention']
     st.markdown(f"""
     <div class="metric-card success-metric">
         <h3>{avg_retention:.1f}%</h3>
@@ -131,7 +166,7 @@ with col2:
     """, unsafe_allow_html=True)
 
 with col3:
-    avg_impact = filtered_df['Community Impact Score'].mean()
+    avg_impact = summary['avg_impact']
     st.markdown(f"""
     <div class="metric-card impact-metric">
         <h3>{avg_impact:.1f}/5.0</h3>
@@ -140,7 +175,7 @@ with col3:
     """, unsafe_allow_html=True)
 
 with col4:
-    total_products = filtered_df['Products Tested'].sum()
+    total_products = summary['products']
     st.markdown(f"""
     <div class="metric-card">
         <h3>{total_products}</h3>
@@ -158,51 +193,65 @@ with tab1:
     
     with col1:
         # Revenue by Region
-        fig_revenue = px.bar(
-            filtered_df, 
-            x='Market Region', 
-            y='Monthly Recurring Revenue (GBP)',
-            color='Market Type',
-            title="Monthly Revenue by Region & Type",
-            color_discrete_sequence=px.colors.qualitative.Set3
-        )
-        fig_revenue.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-        )
+        def build_revenue_by_region():
+            filtered_df = selected_markets()
+            fig_revenue = px.bar(
+                filtered_df, 
+                x='Market Region', 
+                y='Monthly Recurring Revenue (GBP)',
+                color='Market Type',
+                title="Monthly Revenue by Region & Type",
+                color_discrete_sequence=px.colors.qualitative.Set3
+            )
+            fig_revenue.update_layout(
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+            )
+            return fig_revenue
+
+        fig_revenue = figure_cache.get_or_build('revenue_by_region', chart_inputs, build_revenue_by_region)
         st.plotly_chart(fig_revenue, use_container_width=True)
     
     with col2:
         # Retention vs Impact Scatter
-        fig_scatter = px.scatter(
-            filtered_df,
-            x='Client Retention Rate',
-            y='Community Impact Score',
+        def build_retention_vs_impact():
+            filtered_df = selected_markets()
+            fig_scatter = px.scatter(
+                filtered_df,
+                x='Client Retention Rate',
+                y='Community Impact Score',
+                size='Monthly Recurring Revenue (GBP)',
+                color='Market Region',
+                title="Retention Rate vs Community Impact",
+                hover_data=['Market Type', 'Products Tested']
+            )
+            fig_scatter.update_layout(
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+            )
+            return fig_scatter
+
+        fig_scatter = figure_cache.get_or_build('retention_vs_impact', chart_inputs, build_retention_vs_impact)
+        st.plotly_chart(fig_scatter, use_container_width=True)
+    
+    # Products tested vs Project Duration
+    def build_testing_efficiency():
+        fig_products = px.scatter(
+            selected_markets(),
+            x='Project Duration (Months)',
+            y='Products Tested',
             size='Monthly Recurring Revenue (GBP)',
-            color='Market Region',
-            title="Retention Rate vs Community Impact",
-            hover_data=['Market Type', 'Products Tested']
+            color='Community Impact Score',
+            title="Product Testing Efficiency: Duration vs Volume",
+            color_continuous_scale='Viridis'
         )
-        fig_scatter.update_layout(
+        fig_products.update_layout(
             plot_bgcolor='rgba(0,0,0,0)',
             paper_bgcolor='rgba(0,0,0,0)',
         )
-        st.plotly_chart(fig_scatter, use_container_width=True)
-    
-    # Products tested vs Project Duration
-    fig_products = px.scatter(
-        filtered_df,
-        x='Project Duration (Months)',
-        y='Products Tested',
-        size='Monthly Recurring Revenue (GBP)',
-        color='Community Impact Score',
-        title="Product Testing Efficiency: Duration vs Volume",
-        color_continuous_scale='Viridis'
-    )
-    fig_products.update_layout(
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-    )
+        return fig_products
+
+    fig_products = figure_cache.get_or_build('testing_efficiency', chart_inputs, build_testing_efficiency)
     st.plotly_chart(fig_products, use_container_width=True)
 
 with tab2:
@@ -212,12 +261,16 @@ with tab2:
     st.subheader("Regional Performance Summary")
     
     # Create columns for regional metrics
-    metric_cols = st.columns(len(filtered_df['Market Region'].unique()))
+    selected_region_list = [
+        region for region in region_options
+        if region in selected_cells.index.get_level_values('Market Region')
+    ]
+    metric_cols = st.columns(len(selected_region_list))
     
-    for idx, region in enumerate(filtered_df['Market Region'].unique()):
-        region_data = filtered_df[filtered_df['Market Region'] == region]
-        revenue = region_data['Monthly Recurring Revenue (GBP)'].sum()
-        avg_impact = region_data['Community Impact Score'].mean()
+    for idx, region in enumerate(selected_region_list):
+        region_summary = summarize_cells(selected_cells.xs(region, level='Market Region'))
+        revenue = region_summary['revenue']
+        avg_impact = region_summary['avg_impact']
         
         with metric_cols[idx]:
             st.markdown(f"""
@@ -233,7 +286,7 @@ with tab2:
                 <h3 style="margin: 0 0 15px 0; font-size: 1.4em;">{region}</h3>
                 <p style="margin: 8px 0; font-size: 16px; font-weight: bold;">💰 £{revenue:,}</p>
                 <p style="margin: 8px 0; font-size: 14px;">🎯 Impact: {avg_impact:.1f}/5.0</p>
-                <p style="margin: 8px 0; font-size: 14px;">📊 Markets: {len(region_data)}</p>
+                <p style="margin: 8px 0; font-size: 14px;">📊 Markets: {region_summary['markets']}</p>
             </div>
             """, unsafe_allow_html=True)
     
@@ -245,52 +298,47 @@ with tab2:
     
     # Create a simple map representation
     # Since we don't have actual coordinates, we'll create a conceptual map
-    fig_map = go.Figure()
+    def build_market_map():
+        fig_map = go.Figure()
     
-    # Add markers for each region (conceptual positioning)
-    region_coords = {
-        'UK': {'lat': 54.7, 'lon': -2.8},
-        'France': {'lat': 46.6, 'lon': 2.2},
-        'Caribbean': {'lat': 18.2, 'lon': -66.5}
-    }
-    
-    for _, row in filtered_df.iterrows():
-        region = row['Market Region']
-        if region in region_coords:
-            fig_map.add_trace(go.Scattermapbox(
-                lat=[region_coords[region]['lat']],
-                lon=[region_coords[region]['lon']],
-                mode='markers',
-                marker=dict(
-                    size=row['Monthly Recurring Revenue (GBP)']/1000,
-                    color=row['Community Impact Score'],
-                    colorscale='Viridis',
-                    showscale=True,
-                    colorbar=dict(
-                        title="Impact Score",
-                        orientation="h",  # Horizontal orientation
-                        x=0.5,  # Center horizontally
-                        y=-0.1,  # Position below the map
-                        xanchor="center",
-                        len=0.5,  # Make it shorter
-                        thickness=15  # Make it thinner
-                    )
-                ),
-                text=f"{region} - {row['Market Type']}<br>Revenue: £{row['Monthly Recurring Revenue (GBP)']:,}<br>Impact: {row['Community Impact Score']}/5",
-                hoverinfo='text',
-                name=f"{region} ({row['Market Type']})"
-            ))
-    
-    fig_map.update_layout(
-        mapbox=dict(
-            style="open-street-map",
-            center=dict(lat=45, lon=-10),
-            zoom=2
-        ),
-        height=500,
-        margin=dict(l=0, r=0, t=0, b=50)  # Add bottom margin for horizontal colorbar
-    )
+        # One trace for every market (conceptual positioning per region), one shared colorbar
+        map_arrays = market_map_arrays(selected_markets())
+        fig_map.add_trace(go.Scattermapbox(
+            lat=map_arrays['lat'],
+            lon=map_arrays['lon'],
+            mode='markers',
+            marker=dict(
+                size=map_arrays['size'],
+                color=map_arrays['color'],
+                colorscale='Viridis',
+                showscale=True,
+                colorbar=dict(
+                    title="Impact Score",
+                    orientation="h",  # Horizontal orientation
+                    x=0.5,  # Center horizontally
+                    y=-0.1,  # Position below the map
+                    xanchor="center",
+                    len=0.5,  # Make it shorter
+                    thickness=15  # Make it thinner
+                )
+            ),
+            text=map_arrays['text'],
+            hoverinfo='text',
+            name="Markets"
+        ))
     
+        fig_map.update_layout(
+            mapbox=dict(
+                style="open-street-map",
+                center=dict(lat=45, lon=-10),
+                zoom=2
+            ),
+            height=500,
+            margin=dict(l=0, r=0, t=0, b=50)  # Add bottom margin for horizontal colorbar
+        )
+        return fig_map
+
+    fig_map = figure_cache.get_or_build('market_map', chart_inputs, build_market_map)
     st.plotly_chart(fig_map, use_container_width=True)
 
 with tab3:
@@ -300,31 +348,48 @@ with tab3:
     
     with col1:
         # Partner count by region
-        fig_partners = px.bar(
-            filtered_df,
-            x='Market Region',
-            y='Partner Count',
-            color='Market Type',
-            title="Strategic Partners by Region"
-        )
+        def build_partners_by_region():
+            filtered_df = selected_markets()
+            fig_partners = px.bar(
+                filtered_df,
+                x='Market Region',
+                y='Partner Count',
+                color='Market Type',
+                title="Strategic Partners by Region"
+            )
+            return fig_partners
+
+        fig_partners = figure_cache.get_or_build('partners_by_region', chart_inputs, build_partners_by_region)
         st.plotly_chart(fig_partners, use_container_width=True)
     
     with col2:
         # Partnership efficiency (revenue per partner)
-        filtered_df['Revenue per Partner'] = filtered_df['Monthly Recurring Revenue (GBP)'] / filtered_df['Partner Count']
-        fig_efficiency = px.bar(
-            filtered_df,
-            x='Market Region',
-            y='Revenue per Partner',
-            color='Community Impact Score',
-            title="Partnership ROI (Revenue per Partner)",
-            color_continuous_scale='RdYlGn'
-        )
+        def build_partnership_roi():
+            filtered_df = selected_markets()
+            efficiency_df = filtered_df.assign(**{
+                # Markets with no listed partners have no ratio rather than an infinite one
+                'Revenue per Partner': (filtered_df['Monthly Recurring Revenue (GBP)']
+                                        / filtered_df['Partner Count'].replace(0, np.nan))
+            })
+            fig_efficiency = px.bar(
+                efficiency_df,
+                x='Market Region',
+                y='Revenue per Partner',
+                color='Community Impact Score',
+                title="Partnership ROI (Revenue per Partner)",
+                color_continuous_scale='RdYlGn'
+            )
+            return fig_efficiency
+
+        fig_efficiency = figure_cache.get_or_build('partnership_roi', chart_inputs, build_partnership_roi)
         st.plotly_chart(fig_efficiency, use_container_width=True)
     
     # Detailed partnership table
     st.subheader("Partnership Details")
-    partnership_table = filtered_df[['Market Region', 'Market Type', 'Strategic Partners', 'Partner Count', 'Monthly Recurring Revenue (GBP)']].copy()
+    detail_rows = first_matches(df, selected_regions, selected_types, PARTNERSHIP_TABLE_ROWS)
+    if summary['markets'] > len(detail_rows):
+        st.caption(f"Showing the first {len(detail_rows):,} of {summary['markets']:,} markets")
+    partnership_table = detail_rows[['Market Region', 'Market Type', 'Strategic Partners', 'Partner Count', 'Monthly Recurring Revenue (GBP)']].copy()
     partnership_table['Strategic Partners'] = partnership_table['Strategic Partners'].str.replace(';', ', ')
     st.dataframe(partnership_table, use_container_width=True)
 
@@ -335,33 +400,48 @@ with tab4:
     col1, col2 = st.columns(2)
     
     with col1:
-        fig_achievements = px.bar(
-            filtered_df,
-            x='Market Region',
-            y='Achievement Count',
-            color='Project Duration (Months)',
-            title="Achievement Density by Region",
-            color_continuous_scale='Blues'
-        )
+        def build_achievement_density():
+            filtered_df = selected_markets()
+            fig_achievements = px.bar(
+                filtered_df,
+                x='Market Region',
+                y='Achievement Count',
+                color='Project Duration (Months)',
+                title="Achievement Density by Region",
+                color_continuous_scale='Blues'
+            )
+            return fig_achievements
+
+        fig_achievements = figure_cache.get_or_build('achievement_density', chart_inputs, build_achievement_density)
         st.plotly_chart(fig_achievements, use_container_width=True)
     
     with col2:
         # ROI analysis (revenue vs duration)
-        filtered_df['Monthly ROI'] = filtered_df['Monthly Recurring Revenue (GBP)'] / filtered_df['Project Duration (Months)']
-        fig_roi = px.scatter(
-            filtered_df,
-            x='Project Duration (Months)',
-            y='Monthly ROI',
-            size='Products Tested',
-            color='Community Impact Score',
-            title="Project ROI Analysis",
-            color_continuous_scale='Plasma'
-        )
+        def build_project_roi():
+            filtered_df = selected_markets()
+            roi_df = filtered_df.assign(**{
+                'Monthly ROI': filtered_df['Monthly Recurring Revenue (GBP)'] / filtered_df['Project Duration (Months)']
+            })
+            fig_roi = px.scatter(
+                roi_df,
+                x='Project Duration (Months)',
+                y='Monthly ROI',
+                size='Products Tested',
+                color='Community Impact Score',
+                title="Project ROI Analysis",
+                color_continuous_scale='Plasma'
+            )
+            return fig_roi
+
+        fig_roi = figure_cache.get_or_build('project_roi', chart_inputs, build_project_roi)
         st.plotly_chart(fig_roi, use_container_width=True)
     
     # Detailed achievements
     st.subheader("Key Achievements by Market")
-    for _, row in filtered_df.iterrows():
+    achievement_rows = first_matches(df, selected_regions, selected_types, ACHIEVEMENT_EXPANDERS)
+    if summary['markets'] > len(achievement_rows):
+        st.caption(f"Showing the first {len(achievement_rows):,} of {summary['markets']:,} markets")
+    for _, row in achievement_rows.iterrows():
         with st.expander(f"🎯 {row['Market Region']} - {row['Market Type']} Market"):
             achievements = row['Key Achievements'].split(';')
             partners = row['Strategic Partners'].split(';')
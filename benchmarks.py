@@ -0,0 +1,260 @@
+"""Reproducible benchmarks for the fund engine and dashboard data paths.
+
+    python benchmarks.py                       # all sizes, print report
+    python benchmarks.py --sizes 1k,100k --filter risk
+    python benchmarks.py --save-baseline       # record benchmark_baseline.json
+    python benchmarks.py --baseline benchmark_baseline.json  # exit 1 on regression
+
+Synthetic books are generated with fixed seeds at 1k/100k/1M positions.
+Per-row scalar loops are capped at 100k rows to keep runs short. Each
+case reports p50/p95/max latency over its repeats and peak traced memory
+from a separate tracemalloc run.
+"""
+import argparse
+import ast
+import gc
+import json
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from fund_engine import FundManager, PositionStore, RiskManager
+from money import MoneyEngine
+
+ROOT = Path(__file__).resolve().parent
+DEFI_APP = ROOT / 'defi_fund_dashboard.py'
+JONAH_APP = ROOT / 'Jonah Ocean Systems Ltd.py'
+DEFAULT_BASELINE = ROOT / 'benchmark_baseline.json'
+
+SIZES = {'1k': 1000, '100k': 100000, '1M': 1000000}
+SCALAR_LIMIT = 100000
+SEED = 20240601
+IMPORT_BUDGET = 0.100
+
+DEFI_PAGES = ["Executive Summary", "Fund Structure", "Performance Analytics", "Risk & Compliance",
+              "Investment Calculator", "Technical Implementation", "Policy Framework"]
+
+
+def make_positions(n, seed=SEED):
+    """Synthetic investor book: amounts across all tiers, horizons, returns and liquidity"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'amount': rng.uniform(5000, 2500000, n).round(2),
+        'years': rng.integers(1, 11, n),
+        'annual_return': rng.uniform(0.06, 0.25, n),
+        'commitment_months': rng.integers(1, 61, n),
+        'liquidity': rng.choice(['high', 'medium', 'low'], n, p=[0.3, 0.5, 0.2])
+    })
+
+
+def make_markets(n, seed=SEED):
+    """Synthetic raw Jonah.Works market export in the dashboard's CSV layout"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Market Region': rng.choice(['UK', 'France', 'Caribbean'], n),
+        'Market Type': rng.choice(['Urban', 'Rural', 'North', 'South', 'Mixed'], n),
+        'Products Tested': rng.integers(1, 100, n),
+        'Validation Protocol Status': 'Implemented',
+        'Monthly Recurring Revenue (GBP)': rng.integers(1000, 50000, n),
+        'Client Retention Rate': pd.Series(rng.integers(80, 100, n)).astype(str) + '%',
+        'Regulatory Framework Status': 'Compliant',
+        'Community Impact Score': rng.uniform(3, 5, n).round(1),
+        'Strategic Partners': rng.choice(['Local Council;Business Wales', 'French Tech Initiative'], n),
+        'Project Duration (Months)': rng.integers(6, 30, n),
+        'Key Achievements': rng.choice(['Market entry;High retention', 'New market model'], n)
+    })
+
+
+def load_script_function(path, name):
+    """Pull one function (undecorated) plus imports and helpers out of a Streamlit script
+    without executing the page"""
+    tree = ast.parse(Path(path).read_text(encoding='utf-8'))
+    keep = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            modules = [node.module or ''] if isinstance(node, ast.ImportFrom) else [alias.name for alias in node.names]
+            if not any(module.split('.')[0] in ('streamlit', 'plotly') for module in modules):
+                keep.append(node)
+        elif isinstance(node, ast.FunctionDef) and (node.name == name or not node.decorator_list):
+            node.decorator_list = []
+            keep.append(node)
+    namespace = {'__file__': str(path)}
+    sys.path.insert(0, str(Path(path).parent))
+    exec(compile(ast.Module(keep, type_ignores=[]), str(path), 'exec'), namespace)
+    return namespace[name]
+
+
+def run_app(path, page=None, clear_caches=True):
+    """One full script run through Streamlit's AppTest, optionally on a sidebar page"""
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    if clear_caches:
+        st.cache_data.clear()
+        st.cache_resource.clear()
+    app = AppTest.from_file(str(path), default_timeout=600)
+    app.run()
+    if page is not None:
+        app.sidebar.selectbox[0].select(page).run()
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+
+
+def cold_import_seconds(module):
+    """Import time of `module` in a fresh interpreter"""
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return float(output.stdout.strip())
+
+
+def engine_cases(label, n):
+    fund_manager = FundManager()
+    risk_manager = RiskManager()
+    positions = make_positions(n)
+    amounts = positions['amount'].to_numpy()
+    amount_list = amounts.tolist()
+    months_list = positions['commitment_months'].tolist()
+    records = positions[['amount', 'liquidity']].to_dict('records')
+    store = PositionStore.from_frame(positions)
+    money = MoneyEngine(fund_manager)
+    amounts_minor = money.to_minor(amounts)
+
+    if n <= SCALAR_LIMIT:
+        yield f'project_returns[{label}]', lambda: [fund_manager.project_returns(a) for a in amount_list]
+        yield f'calculate_carry_rate[{label}]', lambda: [fund_manager.calculate_carry_rate(a) for a in amount_list]
+        yield f'validate_investment[{label}]', lambda: [
+            fund_manager.validate_investment(a, m) for a, m in zip(amount_list, months_list)]
+        yield f'assess_portfolio_risk[{label}]', lambda: risk_manager.assess_portfolio_risk(records)
+    yield f'project_returns_batch[{label}]', lambda: fund_manager.project_returns_batch(positions)
+    yield f'calculate_carry_rates[{label}]', lambda: fund_manager.calculate_carry_rates(amounts)
+    yield f'validate_investments[{label}]', lambda: fund_manager.validate_investments(positions)
+    yield f'money project_returns[{label}]', lambda: money.project_returns(amounts_minor)
+    yield f'money reconcile[{label}]', lambda: money.reconcile(amounts_minor, amounts_minor)
+    yield f'assess_position_store[{label}]', lambda: risk_manager.assess_position_store(store)
+
+
+def data_cases(label, n, workdir):
+    from jonah_market_data import ingest_market_export, load_market_data
+
+    csv_path = workdir / f'markets_{label}.csv'
+    arrow_path = workdir / f'markets_{label}.arrow'
+    if not arrow_path.exists():
+        make_markets(n).to_csv(csv_path, index=False)
+        ingest_market_export(csv_path, arrow_path)
+    yield f'load_market_data[{label}]', lambda: load_market_data(arrow_path)
+
+
+def fixed_cases(workdir):
+    from spreadsheet_ingest import SPREADSHEET_CSV, load_spreadsheet
+
+    load_fund_data = load_script_function(DEFI_APP, 'load_fund_data')
+    load_data = load_script_function(JONAH_APP, 'load_data')
+    parse_dir = workdir / 'parse'
+
+    def cold_spreadsheet():
+        for cached in parse_dir.glob('*.parquet'):
+            cached.unlink()
+        load_spreadsheet(SPREADSHEET_CSV, cache_dir=parse_dir)
+
+    yield 'load_spreadsheet (parse)', cold_spreadsheet
+    yield 'load_fund_data', load_fund_data
+    yield 'jonah load_data (sample)', load_data
+    for page in DEFI_PAGES:
+        yield f'defi page[{page}]', lambda page=page: run_app(DEFI_APP, page)
+    yield 'jonah dashboard', lambda: run_app(JONAH_APP)
+
+
+def measure(fn, repeat):
+    fn()  # warm-up: imports, lazy tables, parquet engine
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    timings = np.array(timings)
+    return {
+        'p50': float(np.percentile(timings, 50)),
+        'p95': float(np.percentile(timings, 95)),
+        'max': float(timings.max()),
+        'peak_bytes': int(peak),
+        'repeat': repeat
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Names of cases whose p50 or peak memory regressed beyond tolerance"""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if result['p50'] > reference['p50'] * (1 + tolerance):
+            regressions.append(f"{name}: p50 {result['p50'] * 1000:.2f} ms vs {reference['p50'] * 1000:.2f} ms")
+        if result['peak_bytes'] > reference['peak_bytes'] * (1 + tolerance):
+            regressions.append(f"{name}: peak {result['peak_bytes']:,} B vs {reference['peak_bytes']:,} B")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(SIZES), help="comma-separated subset of 1k,100k,1M")
+    parser.add_argument('--filter', default='', help="only run cases whose name contains this text")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--no-pages', action='store_true', help="skip loaders and Streamlit page runs")
+    parser.add_argument('--baseline', type=Path, help="fail if results regress against this file")
+    parser.add_argument('--save-baseline', nargs='?', const=DEFAULT_BASELINE, type=Path)
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--workdir', type=Path, default=ROOT / '.benchmark_data')
+    args = parser.parse_args(argv)
+
+    args.workdir.mkdir(exist_ok=True)
+    sizes = [(label, SIZES[label]) for label in args.sizes.split(',')]
+
+    def all_cases():
+        for label, n in sizes:
+            yield from engine_cases(label, n)
+            yield from data_cases(label, n, args.workdir)
+        if not args.no_pages:
+            yield from fixed_cases(args.workdir)
+
+    results = {}
+    print(f"{'case':<44}{'p50 ms':>12}{'p95 ms':>12}{'max ms':>12}{'peak MiB':>12}")
+    for name, fn in all_cases():
+        if args.filter not in name:
+            continue
+        result = measure(fn, args.repeat)
+        results[name] = result
+        print(f"{name:<44}{result['p50'] * 1000:>12.2f}{result['p95'] * 1000:>12.2f}"
+              f"{result['max'] * 1000:>12.2f}{result['peak_bytes'] / 2 ** 20:>12.2f}")
+
+    failed = False
+    if not args.filter or args.filter in 'fund_engine cold import':
+        import_seconds = min(cold_import_seconds('fund_engine') for _ in range(args.repeat))
+        print(f"fund_engine cold import: {import_seconds * 1000:.1f} ms (budget {IMPORT_BUDGET * 1000:.0f} ms)")
+        failed = import_seconds > IMPORT_BUDGET
+
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(results, indent=2, sort_keys=True))
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
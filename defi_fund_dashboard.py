@@ -7,6 +7,16 @@ from plotly.subplots import make_subplots
 import time
 from datetime import datetime, timedelta
 import inspect
+import os
+from fund_engine import CohortEngine, FundManager, RiskManager
+from shared_engine import SharedEngine
+from monte_carlo import run_monte_carlo
+from nav_stats import NavStatistics, nav_chunks_from_csv, simulated_nav_chunks
+from spreadsheet_ingest import load_spreadsheet
+from figure_cache import FigureCache
+from fee_ledger import FeeAccrual
+from render_profiler import RenderProfiler
+from status_worker import StatusWorker, csv_positions_source
 
 # Page configuration
 st.set_page_config(
@@ -16,6 +26,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Opt-in section timing: DEFI_RENDER_PROFILE=1 or ?profile=1
+profiler = RenderProfiler.from_environment(st.query_params)
+
 # Custom CSS for styling
 st.markdown("""
 <style>
@@ -74,208 +87,193 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Core Classes for Fund Management
-class FundManager:
-    def __init__(self):
-        self.carry_tiers = {
-            'tier_1': {'max': 250000, 'rate': 0.10, 'name': 'Entry Tier'},
-            'tier_2': {'max': 500000, 'rate': 0.15, 'name': 'Growth Tier'},
-            'tier_3': {'max': 2000000, 'rate': 0.20, 'name': 'Premium Tier'}
-        }
-        self.commission_rates = {'standard': 0.01, 'premium': 0.02}
-        self.max_monthly_intake = 2000000
-        self.min_commitment_months = 6
-    
-    def calculate_carry_rate(self, investment_amount):
-        """Determine carry rate based on investment tier"""
-        if investment_amount <= 250000:
-            return self.carry_tiers['tier_1']['rate']
-        elif investment_amount <= 500000:
-            return self.carry_tiers['tier_2']['rate']
-        else:
-            return self.carry_tiers['tier_3']['rate']
-    
-    def get_tier_info(self, investment_amount):
-        """Get detailed tier information"""
-        if investment_amount <= 250000:
-            return self.carry_tiers['tier_1']
-        elif investment_amount <= 500000:
-            return self.carry_tiers['tier_2']
-        else:
-            return self.carry_tiers['tier_3']
-    
-    def project_returns(self, investment, years=4, annual_return=0.12):
-        """Calculate projected returns with compounding"""
-        carry_rate = self.calculate_carry_rate(investment)
-        
-        returns = {}
-        for year in range(1, years + 1):
-            compound_factor = (1 + annual_return) ** year
-            returns[f'year_{year}'] = investment * compound_factor * carry_rate
-        
-        total_return = sum(returns.values())
-        irr = (total_return / investment) ** (1/years) - 1
-        
-        return {
-            'yearly_returns': returns,
-            'total_return': total_return,
-            'irr': irr,
-            'carry_rate': carry_rate
-        }
-    
-    def validate_investment(self, amount, commitment_months):
-        """Validate new investment against risk parameters"""
-        if amount > self.max_monthly_intake:
-            return False, f"Exceeds monthly intake limit of ${self.max_monthly_intake:,}"
-        if commitment_months < self.min_commitment_months:
-            return False, f"Below minimum commitment period of {self.min_commitment_months} months"
-        if amount < 10000:
-            return False, "Minimum investment is $10,000"
-        
-        return True, "Investment approved"
-
-class RiskManager:
-    def __init__(self):
-        self.risk_limits = {
-            'max_monthly_intake': 2000000,
-            'max_concentration': 0.40,
-            'min_liquidity': 0.20,
-            'max_leverage': 2.0,
-            'max_drawdown': 0.15
-        }
-    
-    def assess_portfolio_risk(self, investments):
-        """Comprehensive portfolio risk assessment"""
-        if not investments:
-            return self._empty_portfolio_risk()
-        
-        total_aum = sum(inv.get('amount', 0) for inv in investments)
-        
-        # Concentration risk
-        max_single_investment = max(inv.get('amount', 0) for inv in investments)
-        concentration_ratio = max_single_investment / total_aum if total_aum > 0 else 0
-        
-        # Liquidity assessment (simulated)
-        liquid_investments = sum(inv.get('amount', 0) for inv in investments 
-                               if inv.get('liquidity', 'medium') == 'high')
-        liquidity_ratio = liquid_investments / total_aum if total_aum > 0 else 0
-        
-        # Risk scoring
-        risk_score = self.calculate_risk_score(concentration_ratio, liquidity_ratio, total_aum)
-        
-        return {
-            'total_aum': total_aum,
-            'concentration_risk': concentration_ratio,
-            'liquidity_ratio': liquidity_ratio,
-            'overall_risk_score': risk_score,
-            'risk_status': self.get_risk_status(risk_score),
-            'recommendations': self.get_risk_recommendations(risk_score, concentration_ratio, liquidity_ratio)
-        }
-    
-    def _empty_portfolio_risk(self):
-        return {
-            'total_aum': 0,
-            'concentration_risk': 0,
-            'liquidity_ratio': 0,
-            'overall_risk_score': 0,
-            'risk_status': 'No Portfolio',
-            'recommendations': ['Build initial portfolio with diversified investments']
-        }
-    
-    def calculate_risk_score(self, concentration, liquidity, aum):
-        """Calculate composite risk score"""
-        concentration_weight = 0.4
-        liquidity_weight = 0.3
-        size_weight = 0.3
-        
-        # Normalize and weight factors
-        concentration_risk = min(concentration / self.risk_limits['max_concentration'], 1.0)
-        liquidity_risk = max(0, (self.risk_limits['min_liquidity'] - liquidity) / self.risk_limits['min_liquidity'])
-        size_risk = min(aum / 10000000, 1) * 0.5  # Size creates some risk but also stability
-        
-        risk_score = (
-            concentration_risk * concentration_weight +
-            liquidity_risk * liquidity_weight +
-            size_risk * size_weight
-        )
-        
-        return min(risk_score, 1.0)
-    
-    def get_risk_status(self, risk_score):
-        """Determine risk status based on score"""
-        if risk_score < 0.3:
-            return 'Low Risk'
-        elif risk_score < 0.6:
-            return 'Moderate Risk'
-        elif risk_score < 0.8:
-            return 'High Risk'
-        else:
-            return 'Critical Risk'
-    
-    def get_risk_recommendations(self, risk_score, concentration, liquidity):
-        """Generate risk management recommendations"""
-        recommendations = []
-        
-        if concentration > self.risk_limits['max_concentration']:
-            recommendations.append("Reduce portfolio concentration - consider diversification")
-        
-        if liquidity < self.risk_limits['min_liquidity']:
-            recommendations.append("Increase liquidity buffer - add more liquid investments")
-        
-        if risk_score > 0.7:
-            recommendations.append("Consider reducing overall portfolio risk")
-        
-        if not recommendations:
-            recommendations.append("Portfolio risk profile is within acceptable parameters")
-        
-        return recommendations
-
-# Initialize session state
-if 'fund_manager' not in st.session_state:
-    st.session_state.fund_manager = FundManager()
+@st.cache_resource
+def get_shared_engine():
+    """One FundManager/RiskManager and derived-result cache for every session in the process"""
+    return SharedEngine(maxsize=32)
 
-if 'risk_manager' not in st.session_state:
-    st.session_state.risk_manager = RiskManager()
+# Initialize session state: sessions hold a copy-on-write view, not their own managers
+if 'engine' not in st.session_state:
+    st.session_state.engine = get_shared_engine().session()
+engine = st.session_state.engine
 
 if 'animated_value' not in st.session_state:
     st.session_state.animated_value = 0
 
 # Data definitions based on your spreadsheet
+def format_usd_short(amount):
+    """$250K / $2M style labels for tier ranges"""
+    if amount >= 1000000:
+        return f"${amount / 1000000:g}M"
+    if amount >= 1000:
+        return f"${amount / 1000:g}K"
+    return f"${amount:,.0f}"
+
 @st.cache_data
 def load_fund_data():
-    """Load and process fund performance data"""
+    """Load and process fund performance data from the Calculator Spreadsheet"""
+    blocks = load_spreadsheet()
+    # A plain manager keeps this loader importable on its own (benchmarks.py extracts it)
+    fund_manager = FundManager()
+    
+    # First setup block holds the pilot figures; later blocks are what-if variants
+    totals = blocks['running_totals']
+    pilot = totals[totals['Block'] == 0]
     fund_performance = pd.DataFrame({
-        'Period': ['Months 1-3', 'Months 4-6', 'Months 7-9'],
-        'Invested_Capital': [72500, 125000, 187500],
-        'Commission': [1275, 2500, 1875],
-        'Carry_Revenue': [8244, 12242, 16487],
-        'Cumulative_Total': [8244, 20485, 36973]
+        'Period': pilot['Period'].astype(str).str.replace(' - ', '-').to_numpy(),
+        'Invested_Capital': pilot['Invested_Capital'].round().astype(np.int64).to_numpy(),
+        'Commission': pilot['Commission'].round().astype(np.int64).to_numpy(),
+        'Carry_Revenue': pilot['Three_Year_Take'].round().astype(np.int64).to_numpy(),
+        'Cumulative_Total': pilot['Running_Total'].round().astype(np.int64).to_numpy()
     })
     
+    brackets = blocks['carry_brackets']
+    descriptions = ['Entry institutional access', 'Mid-tier scaling benefits', 'Premium tier optimization']
     carry_structure = pd.DataFrame({
-        'Tier': ['Tier 1', 'Tier 2', 'Tier 3'],
-        'Investment_Range': ['$0 - $250K', '$251K - $500K', '$501K - $2M'],
-        'Carry_Rate': ['10%', '15%', '20%'],
-        'Description': ['Entry institutional access', 'Mid-tier scaling benefits', 'Premium tier optimization']
+        'Tier': [f'Tier {i + 1}' for i in range(len(brackets))],
+        'Investment_Range': [f"{format_usd_short(low)} - {format_usd_short(high)}"
+                             for low, high in zip(brackets['From'], brackets['Upto'])],
+        'Carry_Rate': [f"{rate:.0%}" for rate in brackets['Carry_Rate']],
+        'Description': (descriptions + [''] * len(brackets))[:len(brackets)]
     })
     
+    # Whole-month rows of the first monthly setup; half months are extended-deadline intake
+    monthly = blocks['monthly_setup']
+    monthly = monthly[(monthly['Block'] == 0) & (monthly['Month_Number'] % 1 == 0)]
+    monthly = monthly.drop_duplicates('Month_Number').sort_values('Month_Number')
+    investment = monthly['Amount_Funded'].round().astype(np.int64).to_numpy()
+    
+    # Commissions and year-N carry per vintage in exact cents, not the sheet's float formulas
+    cohorts = CohortEngine(fund_manager, annual_return=0.12, years=3)
+    standard = cohorts.project(investment, commission='standard')
+    carry = standard['carry']
     monthly_breakdown = pd.DataFrame({
-        'Month': ['Month 1', 'Month 2', 'Month 3', 'Month 4', 'Month 5', 'Month 6', 
-                 'Month 7', 'Month 8', 'Month 9'],
-        'Investment': [10000, 15000, 20000, 20000, 30000, 40000, 30000, 45000, 60000],
-        'Commission_1pct': [100, 150, 200, 200, 300, 400, 300, 450, 600],
-        'Commission_2pct': [200, 300, 400, 400, 600, 800, 600, 900, 1200],
-        'Carry_Y1': [120, 180, 240, 240, 360, 480, 360, 540, 720],
-        'Carry_Y2': [254.4, 381.6, 508.8, 508.8, 763.2, 1017.6, 763.2, 1144.8, 1526.4],
-        'Carry_Y3': [405, 607, 810, 810, 1215, 1620, 1215, 1822, 2430]
+        'Month': monthly['Month'].astype(str).to_numpy(),
+        'Investment': investment,
+        'Commission_1pct': standard['commission'],
+        'Commission_2pct': cohorts.project(investment, commission='premium')['commission'],
+        'Carry_Y1': carry[:, 0],
+        'Carry_Y2': carry[:, 1],
+        'Carry_Y3': carry[:, 2]
     })
     
     return fund_performance, carry_structure, monthly_breakdown
 
+@st.cache_data
+def load_monte_carlo(investment, carry_rate, years=4, mean_return=0.12, volatility=0.082, n_paths=10000, seed=42):
+    """Run the seeded Monte Carlo behind the Performance Analytics panel"""
+    return run_monte_carlo(investment, carry_rate, years=years, mean_return=mean_return,
+                           volatility=volatility, n_paths=n_paths, seed=seed)
+
+@st.cache_data
+def load_nav_statistics(nav_file=None, years=4, seed=42):
+    """Hourly NAV streamed through NavStatistics; a simulated series unless a NAV CSV is given"""
+    stats = NavStatistics(window=720, periods_per_year=8760)
+    source = nav_chunks_from_csv(nav_file) if nav_file else simulated_nav_chunks(years=years, seed=seed)
+    return stats.consume(source).summary()
+
+@st.cache_data
+def load_intake_queue(n_commitments=1000, months=12, seed=7):
+    """Simulated commitment queue: whole-month submissions, half-month extended-deadline
+    forms and occasional institutional clips"""
+    rng = np.random.default_rng(seed)
+    extended = rng.random(n_commitments) < 0.2
+    month = rng.integers(1, months + 1, n_commitments) + np.where(extended, 0.5, 0.0)
+    institutional = rng.random(n_commitments) < 0.01
+    amount = np.where(institutional,
+                      rng.uniform(250000, 1500000, n_commitments),
+                      rng.lognormal(9.0, 0.6, n_commitments) + 10000).round(-3)
+    return pd.DataFrame({
+        'amount': amount,
+        'month': month,
+        # Extended-deadline forms must land in their own month; others may slip up to two
+        'deadline': np.where(extended, month, month + rng.integers(0, 3, n_commitments)),
+        'priority': np.where(institutional, 2, rng.integers(0, 2, n_commitments))
+    })
+
+@st.cache_resource
+def load_fee_ledger(start_month='2024-01', end_day='2025-12-31'):
+    """Daily fee ledger for the commitments the intake scheduler admits from the simulated queue"""
+    fund_manager = get_shared_engine().fund_manager
+    queue = load_intake_queue()
+    schedule = fund_manager.intake_scheduler().schedule(
+        queue['amount'], queue['month'], queue['deadline'], queue['priority']
+    )
+    admitted = schedule['status'] == 'admit'
+    # Window N funds on the first day of the Nth month
+    start_days = (np.datetime64(start_month, 'M') + schedule['window'][admitted] - 1).astype('datetime64[D]')
+    accrual = FeeAccrual(fund_manager, annual_return=0.12, commission='premium')
+    return accrual.accrue(queue['amount'].to_numpy()[admitted], start_days, end_day)
+
+@st.cache_data
+def load_client_sleeves(n_sleeves=2000, positions_per_sleeve=40, seed=11):
+    """Simulated client sleeves: position rows plus sleeve-level intake, leverage and drawdown"""
+    rng = np.random.default_rng(seed)
+    sleeve_ids = np.array([f"S-{i:05d}" for i in range(n_sleeves)])
+    sizes = rng.poisson(positions_per_sleeve, n_sleeves) + 1
+    positions = pd.DataFrame({
+        'sleeve': pd.Categorical.from_codes(np.repeat(np.arange(n_sleeves), sizes), sleeve_ids),
+        'amount': rng.lognormal(11, 1.0, sizes.sum()).round(2),
+        'liquidity': pd.Categorical(rng.choice(['high', 'medium', 'low'], sizes.sum(), p=[0.3, 0.5, 0.2]))
+    })
+    profile = pd.DataFrame({
+        'sleeve': sleeve_ids,
+        'monthly_intake': rng.gamma(2.0, 450000, n_sleeves).round(2),
+        'leverage': rng.gamma(6.0, 0.22, n_sleeves).round(2),
+        'drawdown': rng.beta(2, 18, n_sleeves).round(4)
+    })
+    return positions, profile
+
+@st.cache_resource
+def get_figure_cache():
+    """Process-wide Plotly figure cache shared by every session"""
+    return FigureCache(maxsize=64)
+
+@st.cache_resource
+def get_status_worker(interval=30.0):
+    """Process-wide status refresher: DEFI_POSITIONS_FILE if set, else the admitted intake book"""
+    positions_file = os.environ.get('DEFI_POSITIONS_FILE')
+    if positions_file:
+        source = csv_positions_source(positions_file)
+    else:
+        queue = load_intake_queue()
+        schedule = get_shared_engine().fund_manager.intake_scheduler().schedule(
+            queue['amount'], queue['month'], queue['deadline'], queue['priority']
+        )
+        rng = np.random.default_rng(7)
+        book = pd.DataFrame({'amount': queue['amount'].to_numpy()[schedule['status'] == 'admit']})
+        book['liquidity'] = rng.choice(['high', 'medium', 'low'], len(book), p=[0.3, 0.5, 0.2])
+        source = lambda: book
+    worker = StatusWorker(get_shared_engine().risk_manager, source, interval=interval)
+    # One blocking refresh per process so the first render has figures; the thread does the rest
+    worker.refresh()
+    return worker.start()
+
+def format_age(seconds):
+    if seconds < 60:
+        return f"{seconds:.0f} seconds ago"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} minutes ago"
+    return f"{seconds / 3600:.1f} hours ago"
+
+def render_chart(name, inputs, build):
+    """Cached figure build plus Plotly serialization, each timed as its own section"""
+    with profiler.section(f"chart:{name}"):
+        with profiler.section("figure"):
+            fig = figure_cache.get_or_build(name, inputs, build)
+        with profiler.section("plotly_chart"):
+            st.plotly_chart(fig, use_container_width=True)
+
 # Load data
-fund_performance, carry_structure, monthly_breakdown = load_fund_data()
+with profiler.section("load_data"):
+    fund_performance, carry_structure, monthly_breakdown = load_fund_data()
+    figure_cache = get_figure_cache()
+    status_worker = get_status_worker()
+    # One reference read: every widget below renders the same snapshot version
+    status = status_worker.snapshot
 
 # Header section
+profiler.begin("header")
 st.markdown("""
 <div class="main-header">
     <h1>🚀 DeFi Fund Management System</h1>
@@ -320,7 +318,10 @@ with col4:
         delta_color="normal"
     )
 
+profiler.end()
+
 # Sidebar navigation
+profiler.begin("sidebar")
 st.sidebar.title("🧭 Navigation")
 st.sidebar.markdown("---")
 
@@ -332,11 +333,16 @@ page = st.sidebar.selectbox(
 
 # Add some sidebar metrics
 st.sidebar.markdown("### 📊 Quick Stats")
-st.sidebar.metric("Active Investments", "12", delta="2 new this month")
-st.sidebar.metric("Total AUM", "$1.2M", delta="15.3%")
-st.sidebar.metric("Risk Score", "0.34", delta="Low Risk", delta_color="inverse")
+st.sidebar.metric("Active Investments", f"{status['active_investments']:,}",
+                  delta=f"{status['new_investments']:+,} since last refresh")
+st.sidebar.metric("Total AUM", f"${status['total_aum'] / 1000000:,.1f}M", delta=f"{status['aum_change']:+.1%}")
+st.sidebar.metric("Risk Score", f"{status['risk_score']:.2f}", delta=status['risk_status'], delta_color="inverse")
+st.sidebar.caption(f"Snapshot v{status['version']} · updated {format_age(status_worker.age_seconds())}")
+profiler.end()
 
 # Main content based on selection
+profiler.page = page
+profiler.begin(f"page:{page}")
 if page == "Executive Summary":
     st.header("🎯 Executive Summary")
     
@@ -373,111 +379,120 @@ if page == "Executive Summary":
     # Key metrics visualization
     st.subheader("📊 Performance Overview")
     
-    fig = make_subplots(
-        rows=2, cols=2,
-        subplot_titles=('Cumulative Revenue Growth', 'Investment vs Revenue Breakdown', 
-                       'Monthly Investment Trend', 'Carry Rate Distribution'),
-        specs=[[{"secondary_y": False}, {"type": "bar"}],
-               [{"type": "scatter"}, {"type": "pie"}]]
-    )
+    def build_performance_overview():
+        fig = make_subplots(
+            rows=2, cols=2,
+            subplot_titles=('Cumulative Revenue Growth', 'Investment vs Revenue Breakdown', 
+                           'Monthly Investment Trend', 'Carry Rate Distribution'),
+            specs=[[{"secondary_y": False}, {"type": "bar"}],
+                   [{"type": "scatter"}, {"type": "pie"}]]
+        )
     
-    # Line chart for cumulative growth
-    fig.add_trace(
-        go.Scatter(
-            x=fund_performance['Period'],
-            y=fund_performance['Cumulative_Total'],
-            mode='lines+markers',
-            name='Cumulative Revenue',
-            line=dict(color='#10b981', width=4),
-            marker=dict(size=10)
-        ),
-        row=1, col=1
-    )
+        # Line chart for cumulative growth
+        fig.add_trace(
+            go.Scatter(
+                x=fund_performance['Period'],
+                y=fund_performance['Cumulative_Total'],
+                mode='lines+markers',
+                name='Cumulative Revenue',
+                line=dict(color='#10b981', width=4),
+                marker=dict(size=10)
+            ),
+            row=1, col=1
+        )
     
-    # Bar chart for breakdown
-    fig.add_trace(
-        go.Bar(
-            x=fund_performance['Period'],
-            y=fund_performance['Invested_Capital'],
-            name='Invested Capital',
-            marker_color='#3b82f6'
-        ),
-        row=1, col=2
-    )
+        # Bar chart for breakdown
+        fig.add_trace(
+            go.Bar(
+                x=fund_performance['Period'],
+                y=fund_performance['Invested_Capital'],
+                name='Invested Capital',
+                marker_color='#3b82f6'
+            ),
+            row=1, col=2
+        )
     
-    fig.add_trace(
-        go.Bar(
-            x=fund_performance['Period'],
-            y=fund_performance['Carry_Revenue'],
-            name='Carry Revenue',
-            marker_color='#10b981'
-        ),
-        row=1, col=2
-    )
+        fig.add_trace(
+            go.Bar(
+                x=fund_performance['Period'],
+                y=fund_performance['Carry_Revenue'],
+                name='Carry Revenue',
+                marker_color='#10b981'
+            ),
+            row=1, col=2
+        )
     
-    # Monthly trend
-    fig.add_trace(
-        go.Scatter(
-            x=monthly_breakdown['Month'][:6],
-            y=monthly_breakdown['Investment'][:6],
-            mode='lines+markers',
-            name='Monthly Investment',
-            line=dict(color='#f59e0b', width=3)
-        ),
-        row=2, col=1
-    )
+        # Monthly trend
+        fig.add_trace(
+            go.Scatter(
+                x=monthly_breakdown['Month'][:6],
+                y=monthly_breakdown['Investment'][:6],
+                mode='lines+markers',
+                name='Monthly Investment',
+                line=dict(color='#f59e0b', width=3)
+            ),
+            row=2, col=1
+        )
     
-    # Carry rate pie chart
-    fig.add_trace(
-        go.Pie(
-            labels=['Tier 1 (10%)', 'Tier 2 (15%)', 'Tier 3 (20%)'],
-            values=[40, 35, 25],
-            name="Carry Distribution"
-        ),
-        row=2, col=2
-    )
+        # Carry rate pie chart
+        fig.add_trace(
+            go.Pie(
+                labels=['Tier 1 (10%)', 'Tier 2 (15%)', 'Tier 3 (20%)'],
+                values=[40, 35, 25],
+                name="Carry Distribution"
+            ),
+            row=2, col=2
+        )
     
-    fig.update_layout(height=700, showlegend=True, title_text="Fund Performance Dashboard")
-    st.plotly_chart(fig, use_container_width=True)
+        fig.update_layout(height=700, showlegend=True, title_text="Fund Performance Dashboard")
+        return fig
+
+    render_chart('performance_overview', (fund_performance, monthly_breakdown), build_performance_overview)
     
     # Real-time status indicators
     st.subheader("🔄 Real-Time Status")
     
+    age = status_worker.age_seconds()
+    healthy = status_worker.is_alive and status['error'] is None
+    synced = healthy and age <= 2 * status_worker.interval
+    low_risk = status['risk_status'] == 'Low Risk'
+    breached = status['breached_limits']
+    
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.markdown("""
-        <div class="success-box" style="text-align: center;">
-            <h4>🟢 System Status</h4>
-            <p><strong>OPERATIONAL</strong></p>
-            <small>All systems running normally</small>
+        st.markdown(f"""
+        <div class="{'success-box' if healthy else 'highlight-box'}" style="text-align: center;">
+            <h4>{'🟢' if healthy else '🟠'} System Status</h4>
+            <p><strong>{'OPERATIONAL' if healthy else 'DEGRADED'}</strong></p>
+            <small>{'All systems running normally' if healthy else status['error'] or 'Status worker stopped'}</small>
         </div>
         """, unsafe_allow_html=True)
     
     with col2:
-        st.markdown("""
-        <div class="success-box" style="text-align: center;">
+        st.markdown(f"""
+        <div class="{'success-box' if synced else 'highlight-box'}" style="text-align: center;">
             <h4>📊 Data Pipeline</h4>
-            <p><strong>SYNCED</strong></p>
-            <small>Last update: 2 minutes ago</small>
+            <p><strong>{'SYNCED' if synced else 'STALE'}</strong></p>
+            <small>Last update: {format_age(age)}</small>
         </div>
         """, unsafe_allow_html=True)
     
     with col3:
-        st.markdown("""
-        <div class="highlight-box" style="text-align: center;">
+        st.markdown(f"""
+        <div class="{'success-box' if low_risk else 'highlight-box'}" style="text-align: center;">
             <h4>⚠️ Risk Monitor</h4>
-            <p><strong>LOW RISK</strong></p>
-            <small>All parameters within limits</small>
+            <p><strong>{status['risk_status'].upper()}</strong></p>
+            <small>Score {status['risk_score']:.2f} · {status['concentration']:.0%} largest position</small>
         </div>
         """, unsafe_allow_html=True)
     
     with col4:
-        st.markdown("""
-        <div class="success-box" style="text-align: center;">
+        st.markdown(f"""
+        <div class="{'highlight-box' if breached else 'success-box'}" style="text-align: center;">
             <h4>🔒 Compliance</h4>
-            <p><strong>COMPLIANT</strong></p>
-            <small>All checks passed</small>
+            <p><strong>{'BREACH' if breached else 'COMPLIANT'}</strong></p>
+            <small>{', '.join(breached) if breached else f"All {status['limits_checked']} checks passed"}</small>
         </div>
         """, unsafe_allow_html=True)
 
@@ -488,31 +503,33 @@ elif page == "Fund Structure":
     st.subheader("💎 Tiered Carry Structure")
     
     # Create interactive carry structure
-    fig = go.Figure()
-    
-    carry_rates = [10, 15, 20]
-    tiers = ['Tier 1\n$0-$250K', 'Tier 2\n$251K-$500K', 'Tier 3\n$501K-$2M']
-    colors = ['#fbbf24', '#f59e0b', '#d97706']
-    
-    fig.add_trace(go.Bar(
-        x=tiers,
-        y=carry_rates,
-        marker_color=colors,
-        text=[f'{rate}%' for rate in carry_rates],
-        textposition='auto',
-        name='Carry Rate',
-        hovertemplate='<b>%{x}</b><br>Carry Rate: %{y}%<extra></extra>'
-    ))
-    
-    fig.update_layout(
-        title="Carry Rate by Investment Tier",
-        yaxis_title="Carry Rate (%)",
-        xaxis_title="Investment Tiers",
-        height=400,
-        showlegend=False
-    )
+    def build_carry_tiers():
+        fig = go.Figure()
+    
+        carry_rates = [10, 15, 20]
+        tiers = ['Tier 1\n$0-$250K', 'Tier 2\n$251K-$500K', 'Tier 3\n$501K-$2M']
+        colors = ['#fbbf24', '#f59e0b', '#d97706']
     
-    st.plotly_chart(fig, use_container_width=True)
+        fig.add_trace(go.Bar(
+            x=tiers,
+            y=carry_rates,
+            marker_color=colors,
+            text=[f'{rate}%' for rate in carry_rates],
+            textposition='auto',
+            name='Carry Rate',
+            hovertemplate='<b>%{x}</b><br>Carry Rate: %{y}%<extra></extra>'
+        ))
+    
+        fig.update_layout(
+            title="Carry Rate by Investment Tier",
+            yaxis_title="Carry Rate (%)",
+            xaxis_title="Investment Tiers",
+            height=400,
+            showlegend=False
+        )
+        return fig
+
+    render_chart('carry_tiers', (), build_carry_tiers)
     
     # Detailed structure table with styling
     st.subheader("📋 Structure Details")
@@ -536,89 +553,154 @@ elif page == "Fund Structure":
     
     with col1:
         # Commission comparison
-        fig_comm = go.Figure()
+        def build_commission_comparison():
+            fig_comm = go.Figure()
         
-        fig_comm.add_trace(go.Bar(
-            name='1% Commission',
-            x=monthly_breakdown['Month'][:6],
-            y=monthly_breakdown['Commission_1pct'][:6],
-            marker_color='#94a3b8',
-            text=monthly_breakdown['Commission_1pct'][:6],
-            textposition='auto'
-        ))
-        
-        fig_comm.add_trace(go.Bar(
-            name='2% Commission (Recommended)',
-            x=monthly_breakdown['Month'][:6],
-            y=monthly_breakdown['Commission_2pct'][:6],
-            marker_color='#10b981',
-            text=monthly_breakdown['Commission_2pct'][:6],
-            textposition='auto'
-        ))
+            fig_comm.add_trace(go.Bar(
+                name='1% Commission',
+                x=monthly_breakdown['Month'][:6],
+                y=monthly_breakdown['Commission_1pct'][:6],
+                marker_color='#94a3b8',
+                text=monthly_breakdown['Commission_1pct'][:6],
+                textposition='auto'
+            ))
         
-        fig_comm.update_layout(
-            title='Commission Structure Comparison',
-            barmode='group',
-            height=350,
-            yaxis_title='Commission ($)'
-        )
+            fig_comm.add_trace(go.Bar(
+                name='2% Commission (Recommended)',
+                x=monthly_breakdown['Month'][:6],
+                y=monthly_breakdown['Commission_2pct'][:6],
+                marker_color='#10b981',
+                text=monthly_breakdown['Commission_2pct'][:6],
+                textposition='auto'
+            ))
         
-        st.plotly_chart(fig_comm, use_container_width=True)
+            fig_comm.update_layout(
+                title='Commission Structure Comparison',
+                barmode='group',
+                height=350,
+                yaxis_title='Commission ($)'
+            )
+            return fig_comm
+
+        render_chart('commission_comparison', (monthly_breakdown,), build_commission_comparison)
     
     with col2:
         # Carry projection over time
-        fig_carry = go.Figure()
-        
-        fig_carry.add_trace(go.Scatter(
-            x=monthly_breakdown['Month'][:6],
-            y=monthly_breakdown['Carry_Y1'][:6],
-            mode='lines+markers',
-            name='Year 1 Carry',
-            line=dict(color='#3b82f6', width=3),
-            marker=dict(size=8)
-        ))
+        def build_carry_projection():
+            fig_carry = go.Figure()
         
-        fig_carry.add_trace(go.Scatter(
-            x=monthly_breakdown['Month'][:6],
-            y=monthly_breakdown['Carry_Y2'][:6],
-            mode='lines+markers',
-            name='Year 2 Carry',
-            line=dict(color='#f59e0b', width=3),
-            marker=dict(size=8)
-        ))
+            fig_carry.add_trace(go.Scatter(
+                x=monthly_breakdown['Month'][:6],
+                y=monthly_breakdown['Carry_Y1'][:6],
+                mode='lines+markers',
+                name='Year 1 Carry',
+                line=dict(color='#3b82f6', width=3),
+                marker=dict(size=8)
+            ))
         
-        fig_carry.add_trace(go.Scatter(
-            x=monthly_breakdown['Month'][:6],
-            y=monthly_breakdown['Carry_Y3'][:6],
-            mode='lines+markers',
-            name='Year 3 Carry',
-            line=dict(color='#10b981', width=3),
-            marker=dict(size=8)
-        ))
+            fig_carry.add_trace(go.Scatter(
+                x=monthly_breakdown['Month'][:6],
+                y=monthly_breakdown['Carry_Y2'][:6],
+                mode='lines+markers',
+                name='Year 2 Carry',
+                line=dict(color='#f59e0b', width=3),
+                marker=dict(size=8)
+            ))
         
-        fig_carry.update_layout(
-            title='Carry Revenue Projection by Year',
-            height=350,
-            yaxis_title='Carry Revenue ($)'
-        )
+            fig_carry.add_trace(go.Scatter(
+                x=monthly_breakdown['Month'][:6],
+                y=monthly_breakdown['Carry_Y3'][:6],
+                mode='lines+markers',
+                name='Year 3 Carry',
+                line=dict(color='#10b981', width=3),
+                marker=dict(size=8)
+            ))
         
-        st.plotly_chart(fig_carry, use_container_width=True)
+            fig_carry.update_layout(
+                title='Carry Revenue Projection by Year',
+                height=350,
+                yaxis_title='Carry Revenue ($)'
+            )
+            return fig_carry
+
+        render_chart('carry_projection', (monthly_breakdown,), build_carry_projection)
     
+    # Month-end intake run over the whole commitment queue
+    st.subheader("📥 Monthly Intake Scheduler")
+
+    queue = load_intake_queue()
+    with profiler.section("intake_schedule"):
+        schedule = engine.fund_manager.intake_scheduler().schedule(
+            queue['amount'], queue['month'], queue['deadline'], queue['priority']
+        )
+    admitted = schedule['status'] == 'admit'
+    rejected = schedule['status'] == 'reject'
+    capacity = engine.fund_manager.max_monthly_intake
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Commitments Queued", f"{len(queue):,}", delta=f"${queue['amount'].sum() / 1e6:,.1f}M requested")
+    with col2:
+        st.metric("Admitted", f"{admitted.sum():,}", delta=f"${queue['amount'][admitted].sum() / 1e6:,.1f}M")
+    with col3:
+        st.metric("Admitted After Deferral", f"{(admitted & (schedule['deferrals'] > 0)).sum():,}")
+    with col4:
+        st.metric("Rejected", f"{rejected.sum():,}", delta=f"${queue['amount'][rejected].sum() / 1e6:,.1f}M",
+                  delta_color="inverse")
+
+    window_totals = pd.Series(schedule['window_totals'], dtype=float).sort_index()
+
+    def build_intake_windows():
+        fig = go.Figure(go.Bar(
+            x=[f"Month {window}" for window in window_totals.index],
+            y=window_totals.to_numpy(),
+            marker_color='#3b82f6',
+            name='Admitted Intake'
+        ))
+        fig.add_hline(y=capacity, line_dash='dash', line_color='#ef4444',
+                      annotation_text=f"Capacity ${capacity / 1e6:g}M")
+        fig.update_layout(title='Admitted Intake per Monthly Window', height=350, yaxis_title='Intake ($)')
+        return fig
+
+    render_chart('intake_windows', (window_totals, capacity), build_intake_windows)
+
     # Fund economics breakdown
     st.subheader("💰 Fund Economics Breakdown")
     
-    economics_data = {
-        'Revenue Stream': ['Management Fee (2%)', 'Performance Fee (10-20%)', 'Administrative Fee', 'Carried Interest'],
-        'Frequency': ['Monthly', 'Annual', 'Quarterly', 'Upon Exit'],
-        'Est. Annual Revenue': ['$480K', '$2.1M', '$120K', '$1.8M'],
-        'Margin': ['85%', '95%', '60%', '90%']
-    }
-    
-    economics_df = pd.DataFrame(economics_data)
+    # Snapshot-backed point-in-time queries over the daily accrual ledger
+    with profiler.section("fee_ledger"):
+        ledger = load_fee_ledger()
+        as_of = ledger.last_day
+        to_date = ledger.earned_as_of(as_of)
+        trailing_year = ledger.earned_between(as_of - 364, as_of)
+        trailing_month = ledger.earned_between(as_of - 29, as_of)
+
+    tiers = engine.fund_manager.tier_table.tiers
+    management_rate = engine.fund_manager.commission_rates['premium']
+    streams = [f"Management Fee ({management_rate:.0%})"] + [
+        f"Carry - {tier['name']} ({tier['rate']:.0%})" for tier in tiers]
+
+    def by_stream(totals):
+        return np.concatenate(([totals[0].sum()], totals[1]))
+
+    economics_df = pd.DataFrame({
+        'Revenue Stream': streams + ['Total'],
+        'Frequency': ['Daily accrual'] * len(streams) + [''],
+        'Earned to Date': np.append(by_stream(to_date), to_date.sum()),
+        'Last 12 Months': np.append(by_stream(trailing_year), trailing_year.sum()),
+        'Annualized Run-Rate': np.append(by_stream(trailing_month), trailing_month.sum()) * 365 / 30
+    })
+    for column in ('Earned to Date', 'Last 12 Months', 'Annualized Run-Rate'):
+        economics_df[column] = economics_df[column].map('${:,.0f}'.format)
+    st.caption(f"Ledger of {len(ledger):,} daily accruals as of {np.datetime64(as_of, 'D')}")
     st.dataframe(economics_df, use_container_width=True, hide_index=True)
 
 elif page == "Performance Analytics":
     st.header("📈 Performance Analytics & Projections")
+
+    # Volatility, Sharpe and drawdown from the NAV series (DEFI_NAV_FILE for a real export)
+    with profiler.section("nav_statistics"):
+        nav_stats = load_nav_statistics(os.environ.get('DEFI_NAV_FILE'))
     
     # Key performance indicators
     col1, col2, col3, col4 = st.columns(4)
@@ -642,20 +724,20 @@ elif page == "Performance Analytics":
         """, unsafe_allow_html=True)
     
     with col3:
-        st.markdown("""
+        st.markdown(f"""
         <div class="metric-card">
             <h4>📊 Sharpe Ratio</h4>
-            <h2 style="color: #3b82f6;">2.85</h2>
-            <p>Risk-adjusted returns</p>
+            <h2 style="color: #3b82f6;">{nav_stats['sharpe']:.2f}</h2>
+            <p>Risk-adjusted returns (30-day: {nav_stats['rolling_sharpe']:.2f})</p>
         </div>
         """, unsafe_allow_html=True)
     
     with col4:
-        st.markdown("""
+        st.markdown(f"""
         <div style="padding: 1rem; background: linear-gradient(135deg, #f3e8ff 0%, #e9d5ff 100%); border-radius: 8px; text-align: center;">
             <h4 style="color: #111827;">⚡ Volatility</h4>
-            <h2 style="color: #3b82f6;">8.2%</h2>
-            <p style="color: #111827;">Annualized volatility</p>
+            <h2 style="color: #3b82f6;">{nav_stats['volatility']:.1%}</h2>
+            <p style="color: #111827;">Annualized volatility (30-day: {nav_stats['rolling_volatility']:.1%})</p>
         </div>
         """, unsafe_allow_html=True)
     
@@ -672,50 +754,60 @@ elif page == "Performance Analytics":
     })
     
     # Create subplot for scenario analysis
-    fig = make_subplots(
-        rows=1, cols=2,
-        subplot_titles=('Annual Returns by Scenario', '4-Year IRR Projection'),
-        specs=[[{"secondary_y": False}, {"secondary_y": False}]]
-    )
+    def build_scenario_analysis():
+        fig = make_subplots(
+            rows=1, cols=2,
+            subplot_titles=('Annual Returns by Scenario', '4-Year IRR Projection'),
+            specs=[[{"secondary_y": False}, {"secondary_y": False}]]
+        )
+    
+        colors = ['#94a3b8', '#10b981', '#f59e0b', '#ef4444']
+    
+        fig.add_trace(go.Bar(
+            x=scenarios['Scenario'],
+            y=scenarios['Annual_Return'],
+            marker_color=colors,
+            name='Annual Return %',
+            text=scenarios['Annual_Return'],
+            textposition='auto'
+        ), row=1, col=1)
     
-    colors = ['#94a3b8', '#10b981', '#f59e0b', '#ef4444']
-    
-    fig.add_trace(go.Bar(
-        x=scenarios['Scenario'],
-        y=scenarios['Annual_Return'],
-        marker_color=colors,
-        name='Annual Return %',
-        text=scenarios['Annual_Return'],
-        textposition='auto'
-    ), row=1, col=1)
-    
-    fig.add_trace(go.Bar(
-        x=scenarios['Scenario'],
-        y=scenarios['IRR_4Y'],
-        marker_color=colors,
-        name='4-Year IRR %',
-        text=scenarios['IRR_4Y'],
-        textposition='auto'
-    ), row=1, col=2)
-    
-    fig.update_layout(height=400, showlegend=False)
-    st.plotly_chart(fig, use_container_width=True)
+        fig.add_trace(go.Bar(
+            x=scenarios['Scenario'],
+            y=scenarios['IRR_4Y'],
+            marker_color=colors,
+            name='4-Year IRR %',
+            text=scenarios['IRR_4Y'],
+            textposition='auto'
+        ), row=1, col=2)
+    
+        fig.update_layout(height=400, showlegend=False)
+        return fig
+
+    render_chart('scenario_analysis', (scenarios,), build_scenario_analysis)
     
     # Advanced analytics section
     st.subheader("🔍 Advanced Analytics")
     
     col1, col2 = st.columns(2)
     
+    # Monte Carlo on a $1M allocation at the base-case return and volatility
+    mc_investment = 1000000
+    with profiler.section("monte_carlo"):
+        monte_carlo = load_monte_carlo(
+            mc_investment, engine.fund_manager.calculate_carry_rate(mc_investment)
+        )
+    ci_low, ci_high = monte_carlo['ci_95']
+
     with col1:
-        # Monte Carlo simulation results (simulated)
-        st.markdown("""
+        st.markdown(f"""
         <div class="success-box">
-            <h4>🎲 Monte Carlo Simulation (10,000 runs)</h4>
+            <h4>🎲 Monte Carlo Simulation ({monte_carlo['n_paths']:,} runs)</h4>
             <ul>
-                <li><strong>95% Confidence Interval:</strong> 8.2% - 16.8% annual return</li>
-                <li><strong>Probability of Loss:</strong> 12.3%</li>
-                <li><strong>Expected Value:</strong> $847,000 (4-year horizon)</li>
-                <li><strong>Value at Risk (5%):</strong> $156,000</li>
+                <li><strong>95% Confidence Interval:</strong> {ci_low:.1%} - {ci_high:.1%} annual return</li>
+                <li><strong>Probability of Loss:</strong> {monte_carlo['probability_of_loss']:.1%}</li>
+                <li><strong>Expected Carry:</strong> ${monte_carlo['expected_value']:,.0f} ({monte_carlo['years']}-year horizon, $1M invested)</li>
+                <li><strong>Value at Risk (5%):</strong> ${monte_carlo['value_at_risk_5']:,.0f}</li>
             </ul>
         </div>
         """, unsafe_allow_html=True)
@@ -726,8 +818,8 @@ elif page == "Performance Analytics":
         benchmark_data = pd.DataFrame({
             'Benchmark': ['S&P 500', 'DeFi Index', 'Hedge Fund Avg', 'Our Fund'],
             'Annual Return (%)': [10.5, 18.2, 8.7, 12.0],
-            'Volatility (%)': [16.2, 45.8, 12.1, 8.2],
-            'Sharpe Ratio': [0.65, 0.40, 0.55, 2.85]
+            'Volatility (%)': [16.2, 45.8, 12.1, round(nav_stats['volatility'] * 100, 1)],
+            'Sharpe Ratio': [0.65, 0.40, 0.55, round(nav_stats['sharpe'], 2)]
         })
 
         st.markdown("""
@@ -742,32 +834,147 @@ elif page == "Performance Analytics":
     # Summary insights
     st.subheader("📌 Summary Insights")
 
-    st.markdown("""
+    st.markdown(f"""
     <div class="success-box">
         <ul>
-            <li>Our fund demonstrates <strong>exceptional Sharpe ratio (2.85)</strong>, indicating highly efficient risk-adjusted returns.</li>
-            <li><strong>Lower volatility (8.2%)</strong> makes it more stable than DeFi Index or even traditional equities.</li>
-            <li>Risk simulations show a <strong>strong expected value of $847K</strong> over 4 years with only 12.3% chance of loss.</li>
+            <li>Our fund demonstrates a <strong>Sharpe ratio of {nav_stats['sharpe']:.2f}</strong>, indicating efficient risk-adjusted returns.</li>
+            <li><strong>Lower volatility ({nav_stats['volatility']:.1%})</strong> makes it more stable than DeFi Index or even traditional equities.</li>
+            <li>Maximum NAV drawdown of <strong>{nav_stats['max_drawdown']:.1%}</strong> against a {engine.risk_manager.risk_limits['max_drawdown']:.0%} limit.</li>
+            <li>Risk simulations show an <strong>expected carry of ${monte_carlo['expected_value'] / 1000:,.0f}K</strong> over {monte_carlo['years']} years with a {monte_carlo['probability_of_loss']:.1%} chance of loss.</li>
         </ul>
     </div>
     """, unsafe_allow_html=True)
 
 
+elif page == "Risk & Compliance":
+    st.header("🛡️ Risk & Compliance")
+
+    positions, sleeve_profile = load_client_sleeves()
+    risk_manager = engine.risk_manager
+
+    # One grouped pass for position metrics, one vectorized screen over every limit
+    with profiler.section("limit_screen"):
+        screen_start = time.perf_counter()
+        metrics = risk_manager.sleeve_metrics(positions['sleeve'], positions['amount'], positions['liquidity'])
+        profile = sleeve_profile.set_index('sleeve').loc[metrics['sleeves']]
+        for column in ('monthly_intake', 'leverage', 'drawdown'):
+            metrics[column] = profile[column].to_numpy()
+        screen = risk_manager.check_limits(metrics)
+        screen_ms = (time.perf_counter() - screen_start) * 1000
+
+    limit_labels = [name.replace('_', ' ').title() for name in screen['limits']]
+    n_sleeves = len(metrics['sleeves'])
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Sleeves Screened", f"{n_sleeves:,}", delta=f"{len(positions):,} positions")
+    with col2:
+        st.metric("Sleeves in Breach", f"{screen['sleeves_in_breach']:,}",
+                  delta=f"{screen['sleeves_in_breach'] / n_sleeves:.1%} of book", delta_color="inverse")
+    with col3:
+        st.metric("Limits Checked", len(screen['limits']), delta=f"{int(screen['checked'].sum()):,} checks")
+    with col4:
+        st.metric("Screen Time", f"{screen_ms:,.1f} ms", delta="Single vectorized pass")
+
+    st.subheader("📏 Limit Framework")
+
+    def format_limit(name, value):
+        if name == 'max_monthly_intake':
+            return f"${value:,.0f}"
+        if name == 'max_leverage':
+            return f"{value:.1f}x"
+        return f"{value:.0%}"
+
+    limits_df = pd.DataFrame({
+        'Limit': limit_labels,
+        'Threshold': [format_limit(name, value) for name, value in zip(screen['limits'], screen['thresholds'])],
+        'Sleeves in Breach': screen['breach_count'],
+        'Breach Rate': [f"{count / n_sleeves:.1%}" for count in screen['breach_count']]
+    })
+    st.dataframe(limits_df, use_container_width=True, hide_index=True)
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        def build_limit_breaches():
+            fig = go.Figure(go.Bar(
+                x=limit_labels,
+                y=screen['breach_count'],
+                marker_color='#ef4444',
+                text=screen['breach_count'],
+                textposition='auto'
+            ))
+            fig.update_layout(title='Breaches by Limit', height=400, yaxis_title='Sleeves in Breach')
+            return fig
+
+        render_chart('limit_breaches', (limit_labels, screen['breach_count']), build_limit_breaches)
+
+    # Worst sleeves by peak utilization across all limits
+    peak_utilization = np.nanmax(np.where(screen['checked'], screen['utilization'], 0), axis=1)
+    worst = np.argsort(-peak_utilization, kind='stable')[:25]
+
+    with col2:
+        def build_breach_matrix():
+            fig = go.Figure(go.Heatmap(
+                z=np.minimum(screen['utilization'][worst], 2.0),
+                x=limit_labels,
+                y=metrics['sleeves'][worst],
+                zmin=0, zmax=2.0,
+                colorscale=[[0, '#10b981'], [0.5, '#fbbf24'], [1, '#ef4444']],
+                colorbar=dict(title='Utilization'),
+                hovertemplate='<b>%{y}</b><br>%{x}: %{z:.0%} of limit<extra></extra>'
+            ))
+            fig.update_layout(title='Breach Matrix (25 most stretched sleeves)', height=400,
+                              yaxis=dict(autorange='reversed'))
+            return fig
+
+        render_chart('breach_matrix', (metrics['sleeves'][worst], screen['utilization'][worst]), build_breach_matrix)
+
+    st.subheader("🚨 Sleeves in Breach")
+
+    breached = np.flatnonzero(screen['breaches'].any(axis=1))
+    breached = breached[np.argsort(-peak_utilization[breached], kind='stable')]
+    breach_df = pd.DataFrame({
+        'Sleeve': metrics['sleeves'][breached],
+        'AUM': [f"${aum:,.0f}" for aum in metrics['total_aum'][breached]],
+        'Breached Limits': [', '.join(np.array(limit_labels)[row]) for row in screen['breaches'][breached]],
+        'Peak Utilization': [f"{value:.0%}" for value in peak_utilization[breached]]
+    })
+    st.dataframe(breach_df.head(200), use_container_width=True, hide_index=True)
+
 elif page == "Investment Calculator":
     st.header("🧮 Investment Return Calculator")
 
+    sensitivity_mode = st.toggle(
+        "🗺️ Sensitivity grid mode",
+        help="Precompute every amount × return × horizon combination once per server; sliders become lookups"
+    )
+    fund_manager = engine.fund_manager
+
     col1, col2 = st.columns(2)
 
     with col1:
-        investment_amount = st.number_input("💸 Initial Investment ($)", min_value=10000, max_value=2000000, value=50000, step=5000)
+        if sensitivity_mode:
+            investment_amount = st.slider("💸 Initial Investment ($)", 10000, 2000000, 50000, step=10000)
+        else:
+            investment_amount = st.number_input("💸 Initial Investment ($)", min_value=10000, max_value=2000000, value=50000, step=5000)
         investment_years = st.slider("📆 Investment Horizon (Years)", 1, 10, 4)
         annual_return = st.slider("📈 Expected Annual Return (%)", 6, 25, 12) / 100
         commitment_months = st.slider("📑 Commitment Period (Months)", 6, 60, 24)
 
     with col2:
-        fund_manager = st.session_state.fund_manager
         is_valid, message = fund_manager.validate_investment(investment_amount, commitment_months)
-        projection = fund_manager.project_returns(investment_amount, years=investment_years, annual_return=annual_return)
+        if sensitivity_mode:
+            # 200 amounts × 20 returns × 10 horizons, shared by every session on the same settings
+            with profiler.section("sensitivity_grid"):
+                grid = engine.sensitivity_grid(
+                    np.arange(10000, 2000001, 10000), np.arange(6, 26) / 100, np.arange(1, 11)
+                )
+            projection = grid.lookup(investment_amount, annual_return, investment_years)
+            investor_irr = projection['investor_irr']
+        else:
+            projection = fund_manager.project_returns(investment_amount, years=investment_years, annual_return=annual_return)
+            investor_irr = fund_manager.investor_irr(investment_amount, years=investment_years, annual_return=annual_return)
 
         if is_valid:
             st.markdown(f"""
@@ -775,7 +982,8 @@ elif page == "Investment Calculator":
                 <h4>✅ Investment Approved</h4>
                 <p><strong>Carry Rate:</strong> {projection['carry_rate'] * 100:.1f}%</p>
                 <p><strong>Total Return:</strong> ${projection['total_return']:,.2f}</p>
-                <p><strong>Projected IRR:</strong> {projection['irr']:.2%}</p>
+                <p><strong>Projected IRR (net of carry):</strong> {investor_irr:.2%}</p>
+                <p><strong>Annualized Carry Yield:</strong> {projection['irr']:.2%}</p>
             </div>
             """, unsafe_allow_html=True)
         else:
@@ -793,6 +1001,62 @@ elif page == "Investment Calculator":
     })
     st.bar_chart(breakdown_df.set_index("Year"))
 
+    if sensitivity_mode:
+        st.subheader("🗺️ Sensitivity Analysis")
+
+        amount_index, return_index, horizon_index = grid.index(investment_amount, annual_return, investment_years)
+        return_labels = [f"{value:.0%}" for value in grid.annual_returns]
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            total_slice = grid.total_return[:, :, horizon_index].T
+
+            def build_sensitivity_total():
+                fig = go.Figure(go.Heatmap(
+                    z=total_slice,
+                    x=grid.amounts,
+                    y=return_labels,
+                    colorscale='Viridis',
+                    colorbar=dict(title='Carry ($)'),
+                    hovertemplate='Investment: $%{x:,.0f}<br>Return: %{y}<br>Total carry: $%{z:,.0f}<extra></extra>'
+                ))
+                fig.add_trace(go.Scatter(
+                    x=[investment_amount], y=[return_labels[return_index]], mode='markers',
+                    marker=dict(color='white', size=12, line=dict(color='black', width=2)), showlegend=False
+                ))
+                fig.update_layout(title=f'Total Carry: Amount × Return ({investment_years}-year horizon)',
+                                  height=420, xaxis_title='Investment ($)', yaxis_title='Annual Return')
+                return fig
+
+            render_chart('sensitivity_total', (total_slice, investment_amount, return_index), build_sensitivity_total)
+
+        with col2:
+            irr_slice = grid.investor_irr[amount_index].T * 100
+            # Amounts in the same tier share this slice, so the figure names the tier, not the amount
+            tier_name = fund_manager.get_tier_info(investment_amount)['name']
+
+            def build_sensitivity_irr():
+                fig = go.Figure(go.Heatmap(
+                    z=irr_slice,
+                    x=return_labels,
+                    y=grid.horizons,
+                    colorscale='RdYlGn',
+                    zmid=0,
+                    colorbar=dict(title='IRR (%)'),
+                    hovertemplate='Return: %{x}<br>Horizon: %{y} years<br>Investor IRR: %{z:.2f}%<extra></extra>'
+                ))
+                fig.add_trace(go.Scatter(
+                    x=[return_labels[return_index]], y=[investment_years], mode='markers',
+                    marker=dict(color='white', size=12, line=dict(color='black', width=2)), showlegend=False
+                ))
+                fig.update_layout(title=f'Investor IRR: Return × Horizon ({tier_name})',
+                                  height=420, xaxis_title='Annual Return', yaxis_title='Horizon (Years)')
+                return fig
+
+            render_chart('sensitivity_irr', (irr_slice, return_index, investment_years, tier_name),
+                         build_sensitivity_irr)
+
 
 elif page == "Technical Implementation":
     st.header("💻 Technical Implementation & Architecture")
@@ -805,6 +1069,7 @@ elif page == "Technical Implementation":
             <li><strong>Streamlit Dashboard:</strong> Front-end for interactive analytics</li>
             <li><strong>FundManager Class:</strong> Handles carry calculations and validation</li>
             <li><strong>RiskManager Class:</strong> Assesses liquidity, concentration, and composite risk</li>
+            <li><strong>fund_engine Module:</strong> Headless home of both classes, shared with batch jobs</li>
             <li><strong>Plotly Charts:</strong> Used for professional data visualization</li>
             <li><strong>Custom CSS:</strong> For a polished, mobile-responsive UI</li>
         </ul>
@@ -813,11 +1078,12 @@ elif page == "Technical Implementation":
 
     st.subheader("🐍 Core Code Snippets")
 
-    with st.expander("FundManager Class"):
-        st.code(inspect.getsource(FundManager), language='python')
+    with profiler.section("getsource"):
+        with st.expander("FundManager Class"):
+            st.code(inspect.getsource(FundManager), language='python')
 
-    with st.expander("RiskManager Class"):
-        st.code(inspect.getsource(RiskManager), language='python')
+        with st.expander("RiskManager Class"):
+            st.code(inspect.getsource(RiskManager), language='python')
 
     with st.expander("Streamlit Chart Example"):
         st.code("""
@@ -841,3 +1107,17 @@ st.plotly_chart(fig)
         </ul>
     </div>
     """, unsafe_allow_html=True)
+
+profiler.end()
+
+if profiler.enabled:
+    with st.sidebar.expander("⏱️ Render Timing", expanded=False):
+        timing_df = pd.DataFrame(profiler.breakdown())
+        timing_df['section'] = [' ' * depth + name.rsplit('/', 1)[-1]
+                                for depth, name in zip(timing_df['depth'], timing_df['section'])]
+        st.dataframe(
+            timing_df[['section', 'wall_ms', 'cpu_ms', 'alloc_bytes', 'peak_bytes']].round(2),
+            use_container_width=True,
+            hide_index=True
+        )
+    profiler.flush()
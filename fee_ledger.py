@@ -0,0 +1,153 @@
+"""Append-only fee accrual ledger with periodic cumulative snapshots.
+
+FeeLedger stores one row per (day, position, fee type) in growable numpy
+columns. Rows must arrive in day order. Every `snapshot_every` days the
+running (fee type x tier) totals are copied into a snapshot, so a
+point-in-time query is a snapshot lookup plus a scan of at most one
+period of rows, however long the history.
+"""
+import bisect
+
+import numpy as np
+
+FEE_TYPES = ('management', 'carry')
+
+
+def to_day(value):
+    """Day number (days since 1970-01-01) from an int, date, datetime or ISO string"""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return int(np.datetime64(value, 'D').astype(np.int64))
+
+
+class FeeLedger:
+    """Columnar day/position/fee-type/tier/amount rows plus cumulative snapshots"""
+    def __init__(self, n_tiers, snapshot_every=30, capacity=4096):
+        self.n_tiers = n_tiers
+        self.snapshot_every = snapshot_every
+        self._days = np.empty(capacity, dtype=np.int32)
+        self._positions = np.empty(capacity, dtype=np.int32)
+        self._fee_types = np.empty(capacity, dtype=np.int8)
+        self._tiers = np.empty(capacity, dtype=np.int8)
+        self._amounts = np.empty(capacity, dtype=np.float64)
+        self._size = 0
+        self.last_day = None
+        self._totals = np.zeros((len(FEE_TYPES), n_tiers))
+        # Snapshot k: totals of every row dated on or before snapshot_days[k], which end at snapshot_rows[k]
+        self.snapshot_days = []
+        self.snapshot_rows = []
+        self.snapshot_totals = []
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def days(self):
+        return self._days[:self._size]
+
+    @property
+    def amounts(self):
+        return self._amounts[:self._size]
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        if needed > len(self._days):
+            capacity = max(needed, 2 * len(self._days))
+            for name in ('_days', '_positions', '_fee_types', '_tiers', '_amounts'):
+                setattr(self, name, np.resize(getattr(self, name), capacity))
+
+    def _cell_totals(self, fee_types, tiers, amounts):
+        cells = fee_types.astype(np.int64) * self.n_tiers + tiers
+        return np.bincount(cells, weights=amounts, minlength=len(FEE_TYPES) * self.n_tiers).reshape(
+            len(FEE_TYPES), self.n_tiers)
+
+    def append(self, day, positions, fee_type, tiers, amounts):
+        """Append one day's accruals for many positions; days may not go backwards"""
+        day = to_day(day)
+        if self.last_day is not None and day < self.last_day:
+            raise ValueError(f"Ledger is append-only: day {day} is before {self.last_day}")
+        if self.last_day is not None and day // self.snapshot_every > self.last_day // self.snapshot_every:
+            # Close the period(s) the previous rows belong to before opening a new one
+            self.snapshot_days.append(day - day % self.snapshot_every - 1)
+            self.snapshot_rows.append(self._size)
+            self.snapshot_totals.append(self._totals.copy())
+
+        fee_code = FEE_TYPES.index(fee_type) if isinstance(fee_type, str) else fee_type
+        amounts = np.asarray(amounts, dtype=np.float64)
+        count = amounts.size
+        tiers = np.broadcast_to(np.asarray(tiers, dtype=np.int8), count)
+        fee_codes = np.broadcast_to(np.asarray(fee_code, dtype=np.int8), count)
+
+        self._reserve(count)
+        end = self._size + count
+        self._days[self._size:end] = day
+        self._positions[self._size:end] = positions
+        self._fee_types[self._size:end] = fee_codes
+        self._tiers[self._size:end] = tiers
+        self._amounts[self._size:end] = amounts
+        self._size = end
+        self.last_day = day
+        self._totals += self._cell_totals(fee_codes, tiers, amounts)
+
+    def earned_as_of(self, day):
+        """Cumulative (fee type x tier) totals for every row dated on or before `day`"""
+        day = to_day(day)
+        snapshot = bisect.bisect_right(self.snapshot_days, day) - 1
+        if snapshot >= 0:
+            base, start = self.snapshot_totals[snapshot], self.snapshot_rows[snapshot]
+        else:
+            base, start = np.zeros_like(self._totals), 0
+        # Only the rows after the snapshot are scanned
+        end = start + int(np.searchsorted(self._days[start:self._size], day, side='right'))
+        return base + self._cell_totals(self._fee_types[start:end], self._tiers[start:end],
+                                        self._amounts[start:end])
+
+    def earned_between(self, start_day, end_day):
+        """(fee type x tier) totals accrued from `start_day` through `end_day` inclusive"""
+        return self.earned_as_of(end_day) - self.earned_as_of(to_day(start_day) - 1)
+
+    def position_totals(self, n_positions=None):
+        """Lifetime fees per position (full scan)"""
+        return np.bincount(self._positions[:self._size], weights=self.amounts, minlength=n_positions or 0)
+
+
+class FeeAccrual:
+    """Daily management-fee and carry accrual for a book of positions into a FeeLedger.
+
+    Management fee is the annual commission rate on position value; carry
+    is the position's tier rate on each day's compounded profit.
+    """
+    def __init__(self, fund_manager, annual_return=0.12, commission='premium', snapshot_every=30,
+                 client_id=None):
+        self.fund_manager = fund_manager
+        self.annual_return = annual_return
+        self.commission_rate = fund_manager.commission_rates[commission]
+        self.client_id = client_id
+        self.tier_table = fund_manager.get_tier_table(client_id)
+        self.ledger = FeeLedger(len(self.tier_table.tiers), snapshot_every)
+
+    def accrue(self, amounts, start_days, end_day, days_per_year=365):
+        """Accrue every position from its start day through `end_day` (inclusive)"""
+        amounts = np.asarray(amounts, dtype=np.float64)
+        start_days = np.broadcast_to(np.asarray([to_day(day) for day in np.atleast_1d(start_days)]),
+                                     amounts.shape)
+        end_day = to_day(end_day)
+        tiers = self.fund_manager.assign_tiers(amounts, self.client_id).astype(np.int8)
+        carry_rates = self.tier_table.rates[tiers]
+        daily_growth = (1 + self.annual_return) ** (1 / days_per_year)
+
+        order = np.argsort(start_days, kind='stable')
+        sorted_starts = start_days[order]
+        first = int(sorted_starts[0]) if amounts.size else end_day + 1
+        for day in range(first, end_day + 1):
+            # Positions are sorted by start day, so the active set is a growing prefix
+            active_count = int(np.searchsorted(sorted_starts, day, side='right'))
+            if not active_count:
+                continue
+            active = order[:active_count]
+            value = amounts[active] * daily_growth ** (day - start_days[active])
+            self.ledger.append(day, active, 'management', tiers[active],
+                               value * self.commission_rate / days_per_year)
+            self.ledger.append(day, active, 'carry', tiers[active],
+                               value * (daily_growth - 1) * carry_rates[active])
+        return self.ledger
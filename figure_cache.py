@@ -0,0 +1,83 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def _feed(digest, value):
+    """Fold one chart input into the key digest"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        label = list(value.columns) if isinstance(value, pd.DataFrame) else value.name
+        digest.update(repr(label).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(f"{value.dtype}{value.shape}".encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        digest.update(b'(')
+        for item in value:
+            _feed(digest, item)
+        digest.update(b')')
+    elif isinstance(value, dict):
+        _feed(digest, sorted(value.items(), key=lambda item: repr(item[0])))
+    else:
+        digest.update(repr(value).encode())
+    digest.update(b'|')
+
+
+class FigureCache:
+    """Plotly figures keyed by a hash of the inputs that feed each chart, with LRU eviction.
+
+    One instance is shared per process (via st.cache_resource), so the
+    lock guards against concurrent sessions. Builders run outside it.
+    """
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(name, inputs):
+        digest = hashlib.blake2b(digest_size=16)
+        _feed(digest, name)
+        _feed(digest, inputs)
+        return digest.hexdigest()
+
+    def get_or_build(self, name, inputs, build):
+        """Cached figure for `name` and `inputs`, calling `build()` only on a miss"""
+        key = self.make_key(name, inputs)
+        with self._lock:
+            figure = self._figures.get(key)
+            if figure is not None:
+                self._figures.move_to_end(key)
+                self.hits += 1
+                return figure
+
+        figure = build()
+        with self._lock:
+            self.misses += 1
+            self._figures[key] = figure
+            self._figures.move_to_end(key)
+            while len(self._figures) > self.maxsize:
+                self._figures.popitem(last=False)
+                self.evictions += 1
+        return figure
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._figures),
+                'maxsize': self.maxsize
+            }
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
@@ -0,0 +1,1036 @@
+"""Fund and risk engine shared by the dashboard and batch jobs.
+
+Importing this module has no UI side effects and pulls in no heavy
+dependencies: numpy is imported on the first vectorized call, pandas only
+by helpers that return a DataFrame (DataFrame inputs are recognised only
+if the caller has already loaded pandas). Cold import stays far below 100 ms; check with
+`python -X importtime -c "import fund_engine"`.
+"""
+import bisect
+import heapq
+import sys
+
+
+def _is_dataframe(obj):
+    pandas = sys.modules.get('pandas')
+    return pandas is not None and isinstance(obj, pandas.DataFrame)
+
+
+def solve_irr(cash_flows, times=None, periods_per_year=1, guess=0.1, tol=1e-10, max_iter=50):
+    """Annualised IRR of many cash-flow schedules at once.
+
+    `cash_flows` is one schedule or a 2-D array with one schedule per row.
+    `times` gives each flow's time in years (XIRR-style, per column or per
+    cell); by default column k falls at k / periods_per_year, so monthly
+    contributions use periods_per_year=12. Newton's method runs on every
+    row and rows that fail to converge fall back to bisection on a bracket.
+    Rows with no sign change have no IRR and return NaN.
+    """
+    import numpy as np
+    
+    flows = np.asarray(cash_flows, dtype=np.float64)
+    single = flows.ndim == 1
+    flows = np.atleast_2d(flows)
+    if times is None:
+        times = np.arange(flows.shape[1]) / periods_per_year
+    times = np.broadcast_to(np.asarray(times, dtype=np.float64), flows.shape)
+    
+    def npv(rate):
+        return (flows * (1 + rate[:, None]) ** -times).sum(axis=1)
+    
+    rate = np.full(len(flows), guess, dtype=np.float64)
+    converged = np.zeros(len(flows), dtype=bool)
+    active = np.arange(len(flows))
+    with np.errstate(all='ignore'):
+        for _ in range(max_iter):
+            current = rate[active]
+            active_flows, active_times = flows[active], times[active]
+            discount = (1 + current[:, None]) ** -active_times
+            value = (active_flows * discount).sum(axis=1)
+            slope = (-active_times * active_flows * discount).sum(axis=1) / (1 + current)
+            step = value / slope
+            updated = current - step
+            # Steps past -100% are halved back towards it instead of leaving the domain
+            damped = updated <= -1
+            updated = np.where(damped, (current - 1) / 2, updated)
+            finite = np.isfinite(updated)
+            rate[active] = np.where(finite, updated, current)
+            # Tiny steps near -100% can hide a huge NPV, so the residual must be small too;
+            # a damped step is not a Newton step and never signals convergence
+            settled = np.abs(value) <= 1e-6 * np.abs(active_flows).sum(axis=1)
+            done = finite & ~damped & settled & (np.abs(step) <= tol * (1 + np.abs(updated)))
+            converged[active[done]] = True
+            active = active[finite & ~done]
+            if not active.size:
+                break
+        
+        # Bracketed bisection for rows Newton could not settle
+        pending = np.flatnonzero(~converged)
+        if pending.size:
+            flows, times = flows[pending], times[pending]
+            low = np.full(pending.size, -0.999999)
+            high = np.ones(pending.size)
+            f_low = npv(low)
+            for _ in range(60):
+                f_high = npv(high)
+                grow = np.sign(f_high) == np.sign(f_low)
+                if not grow.any():
+                    break
+                high = np.where(grow, high * 2, high)
+            bracketed = np.sign(npv(high)) != np.sign(f_low)
+            for _ in range(200):
+                if np.all(high - low <= tol * (1 + np.abs(low))):
+                    break
+                mid = (low + high) / 2
+                f_mid = npv(mid)
+                left = np.sign(f_mid) == np.sign(f_low)
+                low = np.where(left, mid, low)
+                f_low = np.where(left, f_mid, f_low)
+                high = np.where(left, high, mid)
+            rate[pending] = np.where(bracketed, (low + high) / 2, np.nan)
+    
+    return float(rate[0]) if single else rate
+
+
+class TierTable:
+    """Carry tier schedule compiled into sorted breakpoints for binary-search lookup.
+
+    The tier dicts are copied, so later edits to the caller's schedule need
+    a recompile (FundManager.compile_tiers) and never split the scalar and
+    vectorized paths.
+    """
+    def __init__(self, carry_tiers):
+        self.tiers = sorted((dict(tier) for tier in carry_tiers.values()), key=lambda tier: tier['max'])
+        self._breakpoint_list = [float(tier['max']) for tier in self.tiers]
+        self._last = len(self.tiers) - 1
+        self._arrays = None
+    
+    @property
+    def breakpoints(self):
+        return self._compiled_arrays()[0]
+    
+    @property
+    def rates(self):
+        return self._compiled_arrays()[1]
+    
+    def _compiled_arrays(self):
+        # Built on first vectorized use so scalar lookups never import numpy
+        if self._arrays is None:
+            import numpy as np
+            self._arrays = (
+                np.array(self._breakpoint_list, dtype=np.float64),
+                np.array([tier['rate'] for tier in self.tiers], dtype=np.float64)
+            )
+        return self._arrays
+
+    def tier_index(self, investment_amount):
+        """Index of the tier whose upper bound covers the amount (top tier above the last bound).
+
+        A NaN amount has no tier and raises ValueError, as in tier_indices.
+        """
+        if investment_amount != investment_amount:
+            raise ValueError("Investment amount is NaN")
+        return min(bisect.bisect_left(self._breakpoint_list, investment_amount), self._last)
+
+    def tier_indices(self, investment_amounts):
+        """Vectorized tier_index via np.searchsorted"""
+        import numpy as np
+        investment_amounts = np.asarray(investment_amounts, dtype=np.float64)
+        if np.isnan(investment_amounts).any():
+            raise ValueError("Investment amounts contain NaN")
+        indices = np.searchsorted(self.breakpoints, investment_amounts, side='left')
+        return np.minimum(indices, self._last)
+
+    def rate(self, investment_amount):
+        return self.tiers[self.tier_index(investment_amount)]['rate']
+
+    def rates_for(self, investment_amounts):
+        return self.rates[self.tier_indices(investment_amounts)]
+
+    def tier(self, investment_amount):
+        return self.tiers[self.tier_index(investment_amount)]
+
+class FundManager:
+    # Reason codes from validate_investments, in validate_investment's check order
+    APPROVED, EXCEEDS_INTAKE, SHORT_COMMITMENT, BELOW_MINIMUM = range(4)
+    
+    def __init__(self):
+        self.carry_tiers = {
+            'tier_1': {'max': 250000, 'rate': 0.10, 'name': 'Entry Tier'},
+            'tier_2': {'max': 500000, 'rate': 0.15, 'name': 'Growth Tier'},
+            'tier_3': {'max': 2000000, 'rate': 0.20, 'name': 'Premium Tier'}
+        }
+        self.commission_rates = {'standard': 0.01, 'premium': 0.02}
+        self.max_monthly_intake = 2000000
+        self.min_commitment_months = 6
+        self.min_investment = 10000
+        self.client_carry_tiers = {}
+        self.compile_tiers()
+    
+    def compile_tiers(self):
+        """Rebuild tier tables after editing carry_tiers or client_carry_tiers"""
+        self.tier_table = TierTable(self.carry_tiers)
+        self.client_tier_tables = {
+            client_id: TierTable(tiers) for client_id, tiers in self.client_carry_tiers.items()
+        }
+    
+    def set_client_tiers(self, client_id, carry_tiers):
+        """Register a negotiated tier schedule (any number of tiers) for one client"""
+        self.client_carry_tiers[client_id] = carry_tiers
+        self.client_tier_tables[client_id] = TierTable(carry_tiers)
+    
+    def get_tier_table(self, client_id=None):
+        """Tier table for a client, falling back to the house schedule"""
+        return self.client_tier_tables.get(client_id, self.tier_table)
+    
+    def calculate_carry_rate(self, investment_amount, client_id=None):
+        """Determine carry rate based on investment tier"""
+        return self.get_tier_table(client_id).rate(investment_amount)
+    
+    def get_tier_info(self, investment_amount, client_id=None):
+        """Get detailed tier information"""
+        return self.get_tier_table(client_id).tier(investment_amount)
+    
+    def project_returns(self, investment, years=4, annual_return=0.12, client_id=None):
+        """Calculate projected returns with compounding"""
+        carry_rate = self.calculate_carry_rate(investment, client_id)
+        
+        returns = {}
+        for year in range(1, years + 1):
+            compound_factor = (1 + annual_return) ** year
+            returns[f'year_{year}'] = investment * compound_factor * carry_rate
+        
+        total_return = sum(returns.values())
+        irr = (total_return / investment) ** (1/years) - 1
+        
+        return {
+            'yearly_returns': returns,
+            'total_return': total_return,
+            'irr': irr,
+            'carry_rate': carry_rate
+        }
+
+    def calculate_carry_rates(self, investment_amounts, client_id=None):
+        """Vectorized calculate_carry_rate over an array of investment amounts"""
+        return self.get_tier_table(client_id).rates_for(investment_amounts)
+
+    def assign_tiers(self, investment_amounts, client_id=None):
+        """Vectorized tier assignment, returned as sorted-tier indices"""
+        return self.get_tier_table(client_id).tier_indices(investment_amounts)
+
+    def project_returns_batch(self, investments, years=4, annual_return=0.12, client_id=None):
+        """Vectorized project_returns over a whole book of investments.
+
+        `investments` is an array of amounts, a PositionStore or a DataFrame
+        with an `amount` column and optional `years` / `annual_return` columns; scalars or
+        arrays passed as `years` / `annual_return` fill in missing columns.
+        Row i of `yearly_returns` holds year 1..N carry, zero past that
+        row's horizon.
+        """
+        import numpy as np
+        
+        if _is_dataframe(investments):
+            years = investments['years'].to_numpy() if 'years' in investments else years
+            annual_return = (investments['annual_return'].to_numpy()
+                             if 'annual_return' in investments else annual_return)
+            investments = investments['amount'].to_numpy()
+        elif isinstance(investments, PositionStore):
+            investments = investments.amounts
+
+        amounts = np.asarray(investments, dtype=np.float64)
+        horizons = np.broadcast_to(np.asarray(years, dtype=np.int64), amounts.shape)
+        growth = np.broadcast_to(1 + np.asarray(annual_return, dtype=np.float64), amounts.shape)
+        carry_rates = self.calculate_carry_rates(amounts, client_id)
+        max_years = int(horizons.max()) if amounts.size else 0
+
+        # One column per year keeps the summation order identical to the scalar path
+        yearly_returns = np.zeros((amounts.size, max_years))
+        total_return = np.zeros(amounts.size)
+        for year in range(1, max_years + 1):
+            column = np.where(horizons >= year, amounts * growth ** year * carry_rates, 0.0)
+            yearly_returns[:, year - 1] = column
+            total_return += column
+
+        irr = (total_return / amounts) ** (1 / horizons) - 1
+
+        return {
+            'yearly_returns': yearly_returns,
+            'total_return': total_return,
+            'irr': irr,
+            'carry_rate': carry_rates
+        }
+
+    def investor_cash_flows(self, investment, years=4, annual_return=0.12, client_id=None):
+        """Investor schedule: stake at t=0, net balance returned at the horizon.
+
+        Each year the tier carry rate is charged on that year's profit only
+        (nothing on a loss) and taken out of the balance, as CohortEngine
+        charges carry on profit.
+        """
+        net_growth = 1 + self._net_return(annual_return, self.calculate_carry_rate(investment, client_id))
+        flows = [-investment] + [0.0] * years
+        flows[-1] += investment * net_growth ** years
+        return flows
+
+    @staticmethod
+    def _net_return(annual_return, carry_rate):
+        """Annual return left to the investor after carry on a year's profit"""
+        if hasattr(annual_return, 'shape') or hasattr(carry_rate, 'shape'):
+            import numpy as np
+            return np.where(annual_return > 0, annual_return * (1 - carry_rate), annual_return)
+        return annual_return * (1 - carry_rate) if annual_return > 0 else annual_return
+
+    def investor_irr(self, investment, years=4, annual_return=0.12, client_id=None):
+        """True IRR of investor_cash_flows (net of carry)"""
+        return solve_irr(self.investor_cash_flows(investment, years, annual_return, client_id))
+
+    def investor_irr_batch(self, investments, years=4, annual_return=0.12, client_id=None):
+        """Vectorized investor_irr; accepts the same inputs as project_returns_batch"""
+        import numpy as np
+        
+        if _is_dataframe(investments):
+            years = investments['years'].to_numpy() if 'years' in investments else years
+            annual_return = (investments['annual_return'].to_numpy()
+                             if 'annual_return' in investments else annual_return)
+            investments = investments['amount'].to_numpy()
+        amounts = np.asarray(investments.amounts if isinstance(investments, PositionStore) else investments,
+                             dtype=np.float64)
+        horizons = np.broadcast_to(np.asarray(years, dtype=np.int64), amounts.shape)
+        returns = np.broadcast_to(np.asarray(annual_return, dtype=np.float64), amounts.shape)
+        net_growth = 1 + self._net_return(returns, self.calculate_carry_rates(amounts, client_id))
+        
+        flows = np.zeros((amounts.size, int(horizons.max(initial=0)) + 1))
+        flows[:, 0] = -amounts
+        flows[np.arange(amounts.size), horizons] += amounts * net_growth ** horizons
+        return solve_irr(flows)
+
+    def sensitivity_grid(self, amounts, annual_returns, horizons, client_id=None):
+        """project_returns and investor_irr over the full amount x return x horizon grid"""
+        return SensitivityGrid(self, amounts, annual_returns, horizons, client_id)
+
+    def intake_scheduler(self):
+        """IntakeScheduler sized to max_monthly_intake"""
+        return IntakeScheduler(self.max_monthly_intake)
+
+    def validate_investment(self, amount, commitment_months):
+        """Validate new investment against risk parameters"""
+        if amount > self.max_monthly_intake:
+            code = self.EXCEEDS_INTAKE
+        elif commitment_months < self.min_commitment_months:
+            code = self.SHORT_COMMITMENT
+        elif not amount >= self.min_investment:
+            code = self.BELOW_MINIMUM
+        else:
+            code = self.APPROVED
+        return code == self.APPROVED, self.validation_message(code)
+    
+    def validate_investments(self, amounts, commitment_months=None):
+        """Vectorized validate_investment: one int8 reason code per row.
+        
+        Accepts arrays or a DataFrame with `amount` and optional
+        `commitment_months` columns. Rules are applied as masks, lowest
+        precedence first, so each row keeps the reason the scalar check
+        would report. Missing amounts count as below the minimum; without
+        commitment months the commitment rule is skipped.
+        """
+        import numpy as np
+        
+        if _is_dataframe(amounts):
+            if 'commitment_months' in amounts:
+                commitment_months = amounts['commitment_months'].to_numpy()
+            amounts = amounts['amount'].to_numpy()
+        amounts = np.asarray(amounts, dtype=np.float64)
+        
+        codes = np.zeros(amounts.shape, dtype=np.int8)
+        codes[~(amounts >= self.min_investment)] = self.BELOW_MINIMUM
+        if commitment_months is not None:
+            codes[np.asarray(commitment_months) < self.min_commitment_months] = self.SHORT_COMMITMENT
+        codes[amounts > self.max_monthly_intake] = self.EXCEEDS_INTAKE
+        return codes
+    
+    def validation_message(self, code):
+        """Message for one reason code; only that message is formatted"""
+        if code == self.EXCEEDS_INTAKE:
+            return f"Exceeds monthly intake limit of ${self.max_monthly_intake:,}"
+        if code == self.SHORT_COMMITMENT:
+            return f"Below minimum commitment period of {self.min_commitment_months} months"
+        if code == self.BELOW_MINIMUM:
+            return f"Minimum investment is ${self.min_investment:,}"
+        return "Investment approved"
+    
+    def validation_messages(self, codes=None):
+        """Message per reason code, or the messages for an array of codes"""
+        messages = [self.validation_message(code) for code in range(4)]
+        if codes is None:
+            return messages
+        import numpy as np
+        return np.array(messages, dtype=object)[codes]
+
+class SensitivityGrid:
+    """Precomputed projections, indexed [amount, annual_return, horizon].
+
+    Built in one broadcast pass; lookup() then answers a slider move with
+    the same dict project_returns would return, plus the investor IRR.
+    Year-N carry does not depend on the horizon, so `yearly_returns` keeps
+    one row of years per (amount, return) pair.
+    """
+    def __init__(self, fund_manager, amounts, annual_returns, horizons, client_id=None):
+        import numpy as np
+        self.amounts = np.sort(np.asarray(amounts, dtype=np.float64))
+        self.annual_returns = np.sort(np.asarray(annual_returns, dtype=np.float64))
+        self.horizons = np.sort(np.asarray(horizons, dtype=np.int64))
+        self.carry_rate = fund_manager.calculate_carry_rates(self.amounts, client_id)
+        
+        # Same multiplication and summation order as project_returns
+        years = np.arange(1, int(self.horizons.max()) + 1)
+        compound = (1 + self.annual_returns)[:, None] ** years
+        self.yearly_returns = self.amounts[:, None, None] * compound * self.carry_rate[:, None, None]
+        self.total_return = np.cumsum(self.yearly_returns, axis=2)[:, :, self.horizons - 1]
+        self.irr = (self.total_return / self.amounts[:, None, None]) ** (1 / self.horizons) - 1
+        
+        amount_axis, return_axis, horizon_axis = np.meshgrid(
+            self.amounts, self.annual_returns, self.horizons, indexing='ij')
+        self.investor_irr = fund_manager.investor_irr_batch(
+            amount_axis.ravel(), horizon_axis.ravel(), return_axis.ravel(), client_id
+        ).reshape(self.total_return.shape)
+    
+    @property
+    def shape(self):
+        return self.total_return.shape
+    
+    def index(self, amount, annual_return, years):
+        """Grid coordinates of one input combination; KeyError when it is off-grid"""
+        import numpy as np
+        coordinates = []
+        for axis, value in ((self.amounts, amount), (self.annual_returns, annual_return), (self.horizons, years)):
+            position = min(int(np.searchsorted(axis, value)), len(axis) - 1)
+            if position > 0 and abs(axis[position - 1] - value) < abs(axis[position] - value):
+                position -= 1
+            if not np.isclose(axis[position], value, rtol=1e-12, atol=0):
+                raise KeyError(f"{value!r} is not on the sensitivity grid")
+            coordinates.append(position)
+        return tuple(coordinates)
+    
+    def lookup(self, amount, annual_return, years):
+        """project_returns-shaped result for a grid point, plus 'investor_irr'"""
+        a, r, h = self.index(amount, annual_return, years)
+        yearly = self.yearly_returns[a, r, :self.horizons[h]].tolist()
+        return {
+            'yearly_returns': {f'year_{year}': value for year, value in enumerate(yearly, start=1)},
+            'total_return': float(self.total_return[a, r, h]),
+            'irr': float(self.irr[a, r, h]),
+            'carry_rate': float(self.carry_rate[a]),
+            'investor_irr': float(self.investor_irr[a, r, h])
+        }
+
+class CohortEngine:
+    """Monthly-vintage projection of commissions and year-N carry.
+
+    Each month's intake is a vintage: it pays commission when funded and
+    carry on its cumulative profit at every anniversary, at the carry
+    rate of its tier (the Calculator Spreadsheet's monthly setup). Intake
+    is a months vector or a clients x months matrix. Commission and carry
+    are booked in exact minor units by a MoneyEngine (one is built with
+    default rounding if none is given) and returned in major units.
+    """
+    def __init__(self, fund_manager, annual_return=0.12, years=3, money=None):
+        self.fund_manager = fund_manager
+        self.annual_return = annual_return
+        self.years = years
+        if money is None:
+            from money import MoneyEngine
+            money = MoneyEngine(fund_manager)
+        self.money = money
+    
+    def project(self, intake, commission='standard', client_id=None):
+        import numpy as np
+        
+        intake = np.asarray(intake, dtype=np.float64)
+        intake_minor = self.money.to_minor(intake)
+        carry = self.money.from_minor(
+            self.money.cohort_carry(intake_minor, self.years, self.annual_return, client_id))
+        commissions = self.money.from_minor(self.money.commissions(intake_minor, commission))
+        
+        # Calendar revenue: commission in the funding month, year-N carry 12N months later
+        months = intake.shape[-1]
+        monthly_revenue = np.zeros(months + 12 * self.years)
+        monthly_revenue[:months] += commissions.reshape(-1, months).sum(axis=0)
+        vintage_carry = carry.reshape(-1, months, self.years).sum(axis=0)
+        for year in range(1, self.years + 1):
+            monthly_revenue[12 * year:12 * year + months] += vintage_carry[:, year - 1]
+        
+        return {
+            'commission': commissions,
+            'carry': carry,
+            'vintage_take': commissions + carry.sum(axis=-1),
+            'monthly_revenue': monthly_revenue,
+            'running_total': np.cumsum(monthly_revenue)
+        }
+    
+    def period_totals(self, intake, period_months=3, commission='standard', client_id=None):
+        """Spreadsheet-style setup table: intake, commission, carry by year and take per period"""
+        import numpy as np
+        import pandas as pd
+        
+        intake = np.asarray(intake, dtype=np.float64)
+        result = self.project(intake, commission, client_id)
+        months = intake.shape[-1]
+        starts = np.arange(0, months, period_months)
+        
+        def by_period(values):
+            # Sum over clients, then over each block of vintages
+            values = values.reshape(-1, months, *values.shape[intake.ndim:]).sum(axis=0)
+            return np.add.reduceat(values, starts, axis=0)
+        
+        carry = by_period(result['carry'])
+        table = pd.DataFrame({
+            'Period': [f"Months {start + 1}-{min(start + period_months, months)}" for start in starts],
+            'Invested_Capital': by_period(intake),
+            'Commission': by_period(result['commission'])
+        })
+        for year in range(1, self.years + 1):
+            table[f'Carry_Y{year}'] = carry[:, year - 1]
+        table['Total_Take'] = table['Commission'] + carry.sum(axis=1)
+        table['Running_Total'] = table['Total_Take'].cumsum()
+        return table
+
+class IntakeScheduler:
+    """Allocates monthly intake capacity across a queue of commitments.
+
+    A commitment submitted in month 3 or 3.5 competes for window 3; half
+    months are the spreadsheet's extended-deadline custom forms, so they
+    rank after same-priority whole-month submissions. Each window admits
+    from a heap by (priority desc, submission month, queue order) while
+    capacity lasts. A commitment that does not fit is deferred to the next
+    window until its deadline window, then rejected. Clips larger than a
+    whole window are rejected outright.
+    """
+    def __init__(self, capacity=2000000):
+        self.capacity = capacity
+    
+    def schedule(self, amounts, months, deadlines=None, priorities=None, horizon=None):
+        """Admit/defer/reject every commitment.
+        
+        `deadlines` defaults to the submission window (no deferral). With a
+        `horizon`, windows after it are not allocated and commitments still
+        eligible for them come back as 'defer'.
+        """
+        import numpy as np
+        
+        amounts = np.asarray(amounts, dtype=np.float64)
+        months = np.asarray(months, dtype=np.float64)
+        n = amounts.size
+        windows = np.floor(months).astype(np.int64)
+        last_windows = windows if deadlines is None else np.floor(np.asarray(deadlines, dtype=np.float64)).astype(np.int64)
+        priorities = np.zeros(n) if priorities is None else np.asarray(priorities, dtype=np.float64)
+        
+        status = np.full(n, 'reject', dtype=object)
+        admitted_window = np.full(n, -1, dtype=np.int64)
+        deferrals = np.zeros(n, dtype=np.int64)
+        reasons = np.full(n, 'Deadline passed without capacity', dtype=object)
+        window_totals = {}
+        
+        oversized = amounts > self.capacity
+        reasons[oversized] = f"Exceeds monthly intake limit of ${self.capacity:,}"
+        reasons[last_windows < windows] = "Deadline before submission window"
+        queued = np.flatnonzero(~oversized & (last_windows >= windows))
+        queued = queued[np.argsort(windows[queued], kind='stable')]
+        
+        # Heap keys are plain tuples so ties fall back to submission month, then queue order
+        keys = list(zip((-priorities).tolist(), months.tolist(), range(n)))
+        amount_list = amounts.tolist()
+        last_list = last_windows.tolist()
+        arrivals = windows[queued].tolist()
+        queued = queued.tolist()
+        heap = []
+        next_arrival = 0
+        window = arrivals[0] if arrivals else 0
+        
+        while heap or next_arrival < len(queued):
+            if not heap:
+                window = max(window, arrivals[next_arrival])
+            if horizon is not None and window > horizon:
+                break
+            while next_arrival < len(queued) and arrivals[next_arrival] <= window:
+                heapq.heappush(heap, keys[queued[next_arrival]])
+                next_arrival += 1
+            
+            remaining = self.capacity
+            carried = []
+            while heap:
+                key = heapq.heappop(heap)
+                index = key[2]
+                if amount_list[index] <= remaining:
+                    remaining -= amount_list[index]
+                    status[index] = 'admit'
+                    admitted_window[index] = window
+                    reasons[index] = f"Admitted in month {window}"
+                elif last_list[index] > window:
+                    deferrals[index] += 1
+                    carried.append(key)
+            if remaining < self.capacity:
+                window_totals[window] = self.capacity - remaining
+            
+            # Deferred commitments re-enter the next window's heap in one heapify
+            heap = carried
+            heapq.heapify(heap)
+            window += 1
+        
+        pending = [key[2] for key in heap] + queued[next_arrival:]
+        status[pending] = 'defer'
+        reasons[pending] = "Deferred past the scheduling horizon"
+        return {
+            'status': status,
+            'window': admitted_window,
+            'deferrals': deferrals,
+            'reason': reasons,
+            'window_totals': window_totals
+        }
+
+class PositionStore:
+    """Columnar position book: float64 amounts and int8 liquidity codes.
+
+    Roughly 9 bytes per position instead of a dict each. `amounts` and
+    `liquidity_codes` are zero-copy views sized to the live positions.
+    """
+    __slots__ = ('_amounts', '_liquidity', '_size', 'liquidity_levels', '_level_codes')
+    
+    def __init__(self, capacity=1024, liquidity_levels=('low', 'medium', 'high')):
+        import numpy as np
+        self._amounts = np.empty(capacity, dtype=np.float64)
+        self._liquidity = np.empty(capacity, dtype=np.int8)
+        self._size = 0
+        self.liquidity_levels = list(liquidity_levels)
+        self._level_codes = {level: code for code, level in enumerate(self.liquidity_levels)}
+    
+    @classmethod
+    def from_records(cls, investments):
+        """Build from the list-of-dicts format assess_portfolio_risk accepts"""
+        investments = list(investments)
+        store = cls(capacity=max(len(investments), 1))
+        store.extend(
+            [inv.get('amount', 0) for inv in investments],
+            [inv.get('liquidity', 'medium') for inv in investments]
+        )
+        return store
+    
+    @classmethod
+    def from_frame(cls, frame):
+        """Build from a DataFrame with `amount` and optional `liquidity` columns"""
+        store = cls(capacity=max(len(frame), 1))
+        store.extend(frame['amount'].to_numpy(dtype='float64', na_value=0.0), frame['liquidity'] if 'liquidity' in frame else 'medium')
+        return store
+    
+    def __len__(self):
+        return self._size
+    
+    @property
+    def amounts(self):
+        return self._amounts[:self._size]
+    
+    @property
+    def liquidity_codes(self):
+        return self._liquidity[:self._size]
+    
+    def liquidity_code(self, level):
+        """Code for a liquidity label, registering unseen labels"""
+        code = self._level_codes.get(level)
+        if code is None:
+            code = len(self.liquidity_levels)
+            if code > 127:
+                raise ValueError("Too many distinct liquidity levels")
+            self.liquidity_levels.append(level)
+            self._level_codes[level] = code
+        return code
+    
+    def liquidity_mask(self, level):
+        """Boolean mask of positions at a liquidity level"""
+        code = self._level_codes.get(level)
+        if code is None:
+            import numpy as np
+            return np.zeros(self._size, dtype=bool)
+        return self.liquidity_codes == code
+    
+    def _reserve(self, extra):
+        needed = self._size + extra
+        if needed > len(self._amounts):
+            import numpy as np
+            capacity = max(needed, 2 * len(self._amounts))
+            self._amounts = np.resize(self._amounts, capacity)
+            self._liquidity = np.resize(self._liquidity, capacity)
+    
+    def append(self, amount, liquidity='medium'):
+        self._reserve(1)
+        self._amounts[self._size] = amount
+        self._liquidity[self._size] = self.liquidity_code(liquidity)
+        self._size += 1
+    
+    def extend(self, amounts, liquidity='medium'):
+        """Append arrays of amounts with one liquidity label or a label per position"""
+        import numpy as np
+        amounts = np.asarray(amounts, dtype=np.float64)
+        self._reserve(len(amounts))
+        end = self._size + len(amounts)
+        self._amounts[self._size:end] = amounts
+        # Blank amounts (None/NaN from a CSV) take the dict-path default, 0
+        added = self._amounts[self._size:end]
+        added[np.isnan(added)] = 0.0
+        if isinstance(liquidity, str):
+            self._liquidity[self._size:end] = self.liquidity_code(liquidity)
+        else:
+            # Blank labels (None/NaN from a CSV) take the dict-path default, 'medium'
+            pandas = sys.modules.get('pandas')
+            labels = np.asarray(liquidity, dtype=object)
+            missing = pandas.isna(labels) if pandas is not None else np.equal(labels, None) | (labels != labels)
+            if missing.any():
+                labels = np.where(missing, 'medium', labels)
+            if pandas is not None:
+                inverse, labels = pandas.factorize(labels)
+            else:
+                labels, inverse = np.unique(labels, return_inverse=True)
+            codes = np.array([self.liquidity_code(label) for label in labels], dtype=np.int8)
+            self._liquidity[self._size:end] = codes[inverse]
+        self._size = end
+    
+    def to_records(self):
+        levels = self.liquidity_levels
+        return [
+            {'amount': amount, 'liquidity': levels[code]}
+            for amount, code in zip(self.amounts.tolist(), self.liquidity_codes.tolist())
+        ]
+
+class RiskAccumulator:
+    """Running AUM, largest position and liquid AUM, filled in a single pass"""
+    def __init__(self):
+        self.count = 0
+        self.total_aum = 0
+        self.max_amount = 0
+        self.liquid_aum = 0
+    
+    def add(self, amount, liquidity='medium'):
+        if self.count == 0 or amount > self.max_amount:
+            self.max_amount = amount
+        self.count += 1
+        self.total_aum += amount
+        if liquidity == 'high':
+            self.liquid_aum += amount
+    
+    def update(self, investments):
+        """Consume an iterable of position dicts"""
+        for inv in investments:
+            self.add(inv.get('amount', 0), inv.get('liquidity', 'medium'))
+        return self
+    
+    def update_frame(self, frame):
+        """Consume a DataFrame chunk with `amount` and optional `liquidity` columns"""
+        if frame.empty:
+            return self
+        # Blank amounts count as 0, as a dict without 'amount' does in update()
+        amounts = frame['amount'].to_numpy(dtype='float64', na_value=0.0)
+        chunk_max = amounts.max()
+        if self.count == 0 or chunk_max > self.max_amount:
+            self.max_amount = chunk_max
+        self.count += len(amounts)
+        self.total_aum += amounts.sum()
+        if 'liquidity' in frame:
+            self.liquid_aum += amounts[(frame['liquidity'] == 'high').to_numpy()].sum()
+        return self
+    
+    def update_store(self, store):
+        """Consume a PositionStore through its column views"""
+        import numpy as np
+        
+        if len(store) == 0:
+            return self
+        amounts = store.amounts
+        missing = np.isnan(amounts)
+        if missing.any():
+            amounts = np.where(missing, 0.0, amounts)
+        chunk_max = amounts.max()
+        if self.count == 0 or chunk_max > self.max_amount:
+            self.max_amount = chunk_max
+        self.count += len(amounts)
+        self.total_aum += amounts.sum()
+        self.liquid_aum += amounts[store.liquidity_mask('high')].sum()
+        return self
+
+class PortfolioRiskState:
+    """Live portfolio totals with O(log n) add/remove/resize for intraday re-scoring.
+
+    Exposes the same totals as RiskAccumulator, so RiskManager scores it
+    directly. The largest position comes from a max-heap whose stale
+    entries are discarded lazily when they reach the top.
+    """
+    def __init__(self, risk_manager, investments=()):
+        self.risk_manager = risk_manager
+        self.positions = {}
+        self.count = 0
+        self.total_aum = 0
+        self.liquid_aum = 0
+        self._heap = []
+        for position_id, inv in enumerate(investments):
+            self.add(position_id, inv.get('amount', 0), inv.get('liquidity', 'medium'))
+    
+    @property
+    def max_amount(self):
+        heap = self._heap
+        while heap:
+            neg_amount, position_id = heap[0]
+            position = self.positions.get(position_id)
+            if position is not None and position[0] == -neg_amount:
+                return -neg_amount
+            heapq.heappop(heap)
+        return 0
+    
+    def add(self, position_id, amount, liquidity='medium'):
+        if position_id in self.positions:
+            raise KeyError(f"Position {position_id!r} already tracked")
+        self.positions[position_id] = (amount, liquidity)
+        self.count += 1
+        self.total_aum += amount
+        if liquidity == 'high':
+            self.liquid_aum += amount
+        heapq.heappush(self._heap, (-amount, position_id))
+        self._compact()
+    
+    def remove(self, position_id):
+        amount, liquidity = self.positions.pop(position_id)
+        self.count -= 1
+        if self.count == 0:
+            # Reset rather than subtract so float drift never outlives the book
+            self.total_aum = 0
+            self.liquid_aum = 0
+            self._heap.clear()
+            return
+        self.total_aum -= amount
+        if liquidity == 'high':
+            self.liquid_aum -= amount
+    
+    def resize(self, position_id, amount):
+        liquidity = self.positions[position_id][1]
+        self.remove(position_id)
+        self.add(position_id, amount, liquidity)
+    
+    def _compact(self):
+        # Bound stale heap entries to the live position count
+        if len(self._heap) > 2 * self.count + 64:
+            self._heap = [(-amount, position_id) for position_id, (amount, _) in self.positions.items()]
+            heapq.heapify(self._heap)
+    
+    def assess(self):
+        """Current assess_portfolio_risk result for the live book"""
+        return self.risk_manager.assess_accumulated_risk(self)
+
+class RiskManager:
+    # Sleeve metric each limit is screened against, and whether the limit is a ceiling or a floor
+    LIMIT_METRICS = {
+        'max_monthly_intake': ('monthly_intake', 'max'),
+        'max_concentration': ('concentration', 'max'),
+        'min_liquidity': ('liquidity_ratio', 'min'),
+        'max_leverage': ('leverage', 'max'),
+        'max_drawdown': ('drawdown', 'max')
+    }
+    
+    def __init__(self):
+        self.risk_limits = {
+            'max_monthly_intake': 2000000,
+            'max_concentration': 0.40,
+            'min_liquidity': 0.20,
+            'max_leverage': 2.0,
+            'max_drawdown': 0.15
+        }
+    
+    def assess_portfolio_risk(self, investments):
+        """Comprehensive portfolio risk assessment"""
+        return self.assess_accumulated_risk(RiskAccumulator().update(investments))
+    
+    def assess_portfolio_risk_stream(self, positions):
+        """assess_portfolio_risk over an iterator of position dicts, DataFrame chunks or PositionStores"""
+        accumulator = RiskAccumulator()
+        for item in positions:
+            if _is_dataframe(item):
+                accumulator.update_frame(item)
+            elif isinstance(item, PositionStore):
+                accumulator.update_store(item)
+            else:
+                accumulator.add(item.get('amount', 0), item.get('liquidity', 'medium'))
+        return self.assess_accumulated_risk(accumulator)
+    
+    def assess_position_store(self, store):
+        """Vectorized assess_portfolio_risk over a PositionStore"""
+        return self.assess_accumulated_risk(RiskAccumulator().update_store(store))
+    
+    def sleeve_metrics(self, sleeves, amounts, liquidity=None):
+        """Per-sleeve AUM, concentration and liquidity ratio from position columns.
+
+        `sleeves` labels each position (a categorical Series skips the
+        label sort; rows with a missing label are left out); one grouped
+        pass replaces a call to assess_portfolio_risk per sleeve. Ratios are
+        NaN for empty sleeves.
+        """
+        import numpy as np
+        if hasattr(sleeves, 'cat'):
+            # Categorical sleeves are already factorized; skip the string sort
+            labels = np.asarray(sleeves.cat.categories)
+            codes = sleeves.cat.codes.to_numpy()
+        else:
+            labels, codes = np.unique(np.asarray(sleeves), return_inverse=True)
+        amounts = np.asarray(amounts, dtype=np.float64)
+        n = len(labels)
+        # Rows with a missing categorical sleeve (code -1) belong to no sleeve
+        assigned = codes >= 0
+        
+        total_aum = np.bincount(codes[assigned], weights=amounts[assigned], minlength=n)
+        max_amount = np.zeros(n)
+        np.maximum.at(max_amount, codes[assigned], amounts[assigned])
+        if liquidity is None:
+            liquid_aum = np.zeros(n)
+        else:
+            if not hasattr(liquidity, 'dtype'):
+                liquidity = np.asarray(liquidity)
+            liquid = np.asarray(liquidity == 'high') & assigned
+            liquid_aum = np.bincount(codes[liquid], weights=amounts[liquid], minlength=n)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            funded = total_aum > 0
+            concentration = np.where(funded, max_amount / total_aum, np.nan)
+            liquidity_ratio = np.where(funded, liquid_aum / total_aum, np.nan)
+        return {
+            'sleeves': labels,
+            'total_aum': total_aum,
+            'max_amount': max_amount,
+            'liquid_aum': liquid_aum,
+            'concentration': concentration,
+            'liquidity_ratio': liquidity_ratio
+        }
+    
+    def check_limits(self, metrics, limits=None):
+        """Screen every sleeve against every limit in one vectorized pass.
+        
+        `metrics` maps metric names (see LIMIT_METRICS) to one value per
+        sleeve; a dict, sleeve_metrics() output or a DataFrame all work.
+        Missing metrics or NaN values leave that cell unchecked. Utilization
+        is value/limit for ceilings and limit/value for floors, so anything
+        above 1 is a breach.
+        """
+        import numpy as np
+        limits = self.risk_limits if limits is None else limits
+        names = [name for name in self.LIMIT_METRICS if name in limits]
+        n = None
+        for name in names:
+            metric = self.LIMIT_METRICS[name][0]
+            if metric in metrics:
+                n = len(metrics[metric])
+                break
+        if n is None:
+            raise ValueError("No metric matches any configured limit")
+        
+        values = np.full((n, len(names)), np.nan)
+        for column, name in enumerate(names):
+            metric = self.LIMIT_METRICS[name][0]
+            if metric in metrics:
+                values[:, column] = np.asarray(metrics[metric], dtype=np.float64)
+        
+        thresholds = np.array([limits[name] for name in names], dtype=np.float64)
+        floors = np.array([self.LIMIT_METRICS[name][1] == 'min' for name in names])
+        checked = ~np.isnan(values)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            utilization = np.where(floors, thresholds / values, values / thresholds)
+        breaches = checked & np.where(floors, values < thresholds, values > thresholds)
+        return {
+            'limits': names,
+            'thresholds': thresholds,
+            'values': values,
+            'utilization': utilization,
+            'checked': checked,
+            'breaches': breaches,
+            'breach_count': breaches.sum(axis=0),
+            'sleeves_in_breach': int(breaches.any(axis=1).sum())
+        }
+    
+    def track_portfolio(self, investments=()):
+        """Stateful risk mode: a PortfolioRiskState to update on every fill"""
+        return PortfolioRiskState(self, investments)
+    
+    def assess_accumulated_risk(self, accumulator):
+        """Score a portfolio from its RiskAccumulator totals"""
+        if accumulator.count == 0:
+            return self._empty_portfolio_risk()
+        
+        total_aum = accumulator.total_aum
+        
+        # Concentration risk
+        concentration_ratio = accumulator.max_amount / total_aum if total_aum > 0 else 0
+        
+        # Liquidity assessment (simulated)
+        liquidity_ratio = accumulator.liquid_aum / total_aum if total_aum > 0 else 0
+        
+        # Risk scoring
+        risk_score = self.calculate_risk_score(concentration_ratio, liquidity_ratio, total_aum)
+        
+        return {
+            'total_aum': total_aum,
+            'concentration_risk': concentration_ratio,
+            'liquidity_ratio': liquidity_ratio,
+            'overall_risk_score': risk_score,
+            'risk_status': self.get_risk_status(risk_score),
+            'recommendations': self.get_risk_recommendations(risk_score, concentration_ratio, liquidity_ratio)
+        }
+    
+    def _empty_portfolio_risk(self):
+        return {
+            'total_aum': 0,
+            'concentration_risk': 0,
+            'liquidity_ratio': 0,
+            'overall_risk_score': 0,
+            'risk_status': 'No Portfolio',
+            'recommendations': ['Build initial portfolio with diversified investments']
+        }
+    
+    def calculate_risk_score(self, concentration, liquidity, aum):
+        """Calculate composite risk score"""
+        concentration_weight = 0.4
+        liquidity_weight = 0.3
+        size_weight = 0.3
+        
+        # Normalize and weight factors
+        concentration_risk = min(concentration / self.risk_limits['max_concentration'], 1.0)
+        liquidity_risk = max(0, (self.risk_limits['min_liquidity'] - liquidity) / self.risk_limits['min_liquidity'])
+        size_risk = min(aum / 10000000, 1) * 0.5  # Size creates some risk but also stability
+        
+        risk_score = (
+            concentration_risk * concentration_weight +
+            liquidity_risk * liquidity_weight +
+            size_risk * size_weight
+        )
+        
+        return min(risk_score, 1.0)
+    
+    def get_risk_status(self, risk_score):
+        """Determine risk status based on score"""
+        if risk_score < 0.3:
+            return 'Low Risk'
+        elif risk_score < 0.6:
+            return 'Moderate Risk'
+        elif risk_score < 0.8:
+            return 'High Risk'
+        else:
+            return 'Critical Risk'
+    
+    def get_risk_recommendations(self, risk_score, concentration, liquidity):
+        """Generate risk management recommendations"""
+        recommendations = []
+        
+        if concentration > self.risk_limits['max_concentration']:
+            recommendations.append("Reduce portfolio concentration - consider diversification")
+        
+        if liquidity < self.risk_limits['min_liquidity']:
+            recommendations.append("Increase liquidity buffer - add more liquid investments")
+        
+        if risk_score > 0.7:
+            recommendations.append("Consider reducing overall portfolio risk")
+        
+        if not recommendations:
+            recommendations.append("Portfolio risk profile is within acceptable parameters")
+        
+        return recommendations
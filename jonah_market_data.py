@@ -0,0 +1,187 @@
+import numpy as np
+import pandas as pd
+
+CATEGORY_COLUMNS = ['Market Region', 'Market Type']
+
+# Conceptual marker positions per region for the Geographic map
+REGION_COORDS = {
+    'UK': {'lat': 54.7, 'lon': -2.8},
+    'France': {'lat': 46.6, 'lon': 2.2},
+    'Caribbean': {'lat': 18.2, 'lon': -66.5}
+}
+
+COMPACT_DTYPES = {
+    'Products Tested': np.int32,
+    'Monthly Recurring Revenue (GBP)': np.int64,
+    'Client Retention Rate': np.float32,
+    'Community Impact Score': np.float32,
+    'Project Duration (Months)': np.int16,
+    'Partner Count': np.int16,
+    'Achievement Count': np.int16
+}
+
+
+def prepare_market_frame(df, categories=None):
+    """Ingest-time cleaning: numeric retention, partner/achievement counts and compact dtypes.
+
+    Blank partner/achievement cells become empty strings with a count of 0;
+    blank integer cells (revenue, products, duration) become 0.
+    """
+    df = df.copy()
+    retention = df['Client Retention Rate']
+    if not pd.api.types.is_numeric_dtype(retention):
+        retention = pd.to_numeric(retention.astype(str).str.rstrip('%'), errors='coerce')
+    df['Client Retention Rate'] = retention
+    for text_column, count_column in (('Strategic Partners', 'Partner Count'),
+                                      ('Key Achievements', 'Achievement Count')):
+        text = df[text_column].fillna('').astype(str)
+        df[text_column] = text
+        df[count_column] = np.where(text.str.strip() != '', text.str.count(';') + 1, 0)
+    integer_columns = [column for column, dtype in COMPACT_DTYPES.items()
+                       if column in df and np.issubdtype(dtype, np.integer)]
+    df[integer_columns] = df[integer_columns].fillna(0)
+
+    for column in CATEGORY_COLUMNS:
+        # Without an explicit category list keep first-appearance order for the filters
+        column_categories = (categories or {}).get(column)
+        if column_categories is None:
+            column_categories = pd.unique(df[column].dropna())
+        df[column] = pd.Categorical(df[column], categories=column_categories)
+    return df.astype({column: dtype for column, dtype in COMPACT_DTYPES.items() if column in df})
+
+
+def build_market_cube(df):
+    """Revenue, products, retention and impact sums per (region, type) cell plus market counts.
+
+    Retention and impact sums skip blank cells and carry their own
+    non-blank counts, which summarize_cells divides by.
+    """
+    regions = df['Market Region'].cat
+    types = df['Market Type'].cat
+    n_types = len(types.categories)
+    size = len(regions.categories) * n_types
+    cells = regions.codes.astype(np.int64) * n_types + types.codes
+
+    def cell_sums(column):
+        values = df[column].to_numpy(dtype=np.float64)
+        return np.bincount(cells, weights=np.nan_to_num(values), minlength=size)
+
+    def cell_counts(column):
+        # Markets with a value in `column`; blank cells drop out of that metric's average
+        return np.bincount(cells, weights=df[column].notna().to_numpy(), minlength=size).astype(np.int64)
+
+    cube = pd.DataFrame({
+        'revenue': cell_sums('Monthly Recurring Revenue (GBP)'),
+        'products': cell_sums('Products Tested'),
+        'retention': cell_sums('Client Retention Rate'),
+        'retention_count': cell_counts('Client Retention Rate'),
+        'impact': cell_sums('Community Impact Score'),
+        'impact_count': cell_counts('Community Impact Score'),
+        'markets': np.bincount(cells, minlength=size)
+    }, index=pd.MultiIndex.from_product([regions.categories, types.categories],
+                                        names=['Market Region', 'Market Type']))
+    cube = cube[cube['markets'] > 0]
+    return cube.astype({'revenue': np.int64, 'products': np.int64})
+
+
+def select_cells(cube, regions, types):
+    """Cube cells for a sidebar selection"""
+    return cube[
+        cube.index.get_level_values('Market Region').isin(regions) &
+        cube.index.get_level_values('Market Type').isin(types)
+    ]
+
+
+def summarize_cells(cells):
+    """Card figures from a set of cube cells; means are over the markets with a value"""
+    retention_count = cells['retention_count'].sum()
+    impact_count = cells['impact_count'].sum()
+    return {
+        'revenue': cells['revenue'].sum(),
+        'products': cells['products'].sum(),
+        'avg_retention': cells['retention'].sum() / retention_count if retention_count else np.nan,
+        'avg_impact': cells['impact'].sum() / impact_count if impact_count else np.nan,
+        'markets': cells['markets'].sum()
+    }
+
+
+def first_matches(df, regions, types, limit, block=65536):
+    """Up to `limit` rows in the selection, scanning block by block and stopping once filled"""
+    parts = []
+    found = 0
+    for start in range(0, len(df), block):
+        chunk = df.iloc[start:start + block]
+        hits = chunk[chunk['Market Region'].isin(regions) & chunk['Market Type'].isin(types)]
+        if len(hits):
+            parts.append(hits.iloc[:limit - found])
+            found += len(parts[-1])
+        if found >= limit:
+            break
+    return pd.concat(parts) if parts else df.iloc[:0]
+
+
+def market_map_arrays(df, region_coords=REGION_COORDS):
+    """Column arrays for a single map trace; rows in regions without coordinates are dropped"""
+    categories = df['Market Region'].cat.categories
+    lat_table = np.array([region_coords.get(region, {}).get('lat', np.nan) for region in categories])
+    lon_table = np.array([region_coords.get(region, {}).get('lon', np.nan) for region in categories])
+    codes = df['Market Region'].cat.codes.to_numpy()
+    lat = np.where(codes >= 0, lat_table[codes], np.nan)
+    lon = np.where(codes >= 0, lon_table[codes], np.nan)
+    located = ~np.isnan(lat)
+
+    rows = df[located]
+    revenue = rows['Monthly Recurring Revenue (GBP)']
+    impact = rows['Community Impact Score']
+    text = (
+        rows['Market Region'].astype(str) + ' - ' + rows['Market Type'].astype(str)
+        + '<br>Revenue: £' + revenue.map('{:,}'.format)
+        + '<br>Impact: ' + impact.map('{:g}'.format) + '/5'
+    )
+    return {
+        'lat': lat[located],
+        'lon': lon[located],
+        'size': revenue.to_numpy() / 1000,
+        'color': impact.to_numpy(),
+        'text': text.to_numpy()
+    }
+
+
+def ingest_market_export(csv_path, arrow_path, chunksize=500000):
+    """Convert a raw market CSV export into a memory-mappable Arrow IPC file.
+
+    The first pass reads only the category columns so every chunk shares
+    one dictionary; the second pass cleans and writes chunk by chunk.
+    """
+    import pyarrow as pa
+
+    categories = {column: set() for column in CATEGORY_COLUMNS}
+    for chunk in pd.read_csv(csv_path, usecols=CATEGORY_COLUMNS, chunksize=chunksize):
+        for column in CATEGORY_COLUMNS:
+            categories[column].update(chunk[column].dropna().unique())
+    categories = {column: sorted(values) for column, values in categories.items()}
+
+    writer = None
+    try:
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+            table = pa.Table.from_pandas(prepare_market_frame(chunk, categories), preserve_index=False)
+            if writer is None:
+                writer = pa.ipc.new_file(str(arrow_path), table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def load_market_data(arrow_path):
+    """Memory-map an ingested Arrow file and convert it to pandas.
+
+    The file is read without copying, but to_pandas concatenates the
+    ingest's record batches, so each numeric column is copied into RAM
+    once (about the size of the numeric data).
+    """
+    import pyarrow as pa
+
+    with pa.memory_map(str(arrow_path)) as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True)
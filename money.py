@@ -0,0 +1,191 @@
+"""Fixed-point money: int64 minor units with explicit rounding.
+
+Amounts are held as integer cents (minor_units=100) and rates as integer
+ratios over RATE_SCALE, so every fee and carry figure is an exact integer
+product followed by one rounded integer division. Balances compound with
+a rounding step each year, as a ledger would book them.
+"""
+import numpy as np
+
+RATE_SCALE = 10 ** 6
+ROUNDING_MODES = ('half_even', 'half_up', 'down', 'up', 'floor', 'ceiling')
+_INT64_MAX = np.iinfo(np.int64).max
+_FLOAT_EXACT = 2 ** 52
+
+
+def _largest_magnitude(values):
+    # Two reductions instead of an np.abs temporary
+    return max(-int(values.min()), int(values.max())) if values.size else 0
+
+
+def divide_rounded(numerator, denominator, mode='half_even', bound=None):
+    """Integer numerator / positive integer denominator, rounded per `mode`.
+
+    half_even is banker's rounding, half_up rounds ties away from zero,
+    down/up round toward/away from zero, floor/ceiling toward -inf/+inf.
+    `bound` is a known upper limit on |numerator|, saving a scan.
+    """
+    numerator = np.asarray(numerator, dtype=np.int64)
+    if bound is None:
+        bound = _largest_magnitude(numerator)
+    if mode == 'half_even' and bound < _FLOAT_EXACT:
+        # Below 2**52 the float quotient is off by under 1/(2 * denominator), which can
+        # never cross or fake a tie, so rint's banker's rounding is exact and SIMD-fast
+        return np.rint(numerator / denominator).astype(np.int64)
+    # Floor division plus a multiply is several times faster than np.divmod on int64
+    quotient = numerator // denominator
+    remainder = numerator - quotient * denominator
+    inexact = remainder != 0
+    twice = 2 * remainder
+    if mode == 'floor':
+        bump = np.zeros_like(inexact)
+    elif mode == 'ceiling':
+        bump = inexact
+    elif mode == 'down':
+        bump = inexact & (numerator < 0)
+    elif mode == 'up':
+        bump = inexact & (numerator >= 0)
+    elif mode == 'half_up':
+        bump = (twice > denominator) | ((twice == denominator) & (numerator >= 0))
+    elif mode == 'half_even':
+        bump = (twice > denominator) | ((twice == denominator) & (quotient & 1 == 1))
+    else:
+        raise ValueError(f"Unknown rounding mode {mode!r}; expected one of {ROUNDING_MODES}")
+    return quotient + bump
+
+
+def rate_ratio(rate, scale=RATE_SCALE):
+    """Integer numerator(s) of `rate` over `scale`; rates finer than 1/scale are rejected"""
+    rate = np.asarray(rate, dtype=np.float64)
+    numerator = np.round(rate * scale)
+    if not np.allclose(numerator / scale, rate, rtol=0, atol=1e-12):
+        raise ValueError(f"Rate has more precision than 1/{scale}")
+    return numerator.astype(np.int64)
+
+
+def multiply_ratio(minor, numerators, mode='half_even', scale=RATE_SCALE):
+    """minor * numerators / scale with one rounding step; the int64 product is bounds-checked first"""
+    minor = np.asarray(minor, dtype=np.int64)
+    numerators = np.asarray(numerators, dtype=np.int64)
+    largest = _largest_magnitude(minor) * _largest_magnitude(numerators)
+    if largest > _INT64_MAX:
+        raise OverflowError("Amount x rate does not fit in int64 minor units")
+    return divide_rounded(minor * numerators, scale, mode, bound=largest)
+
+
+def multiply_rate(minor, rate, mode='half_even', scale=RATE_SCALE):
+    """minor * rate in minor units, exactly, with one rounding step"""
+    return multiply_ratio(minor, rate_ratio(rate, scale), mode, scale)
+
+
+def to_minor(amounts, minor_units=100, mode='half_even'):
+    """Float major units to int64 minor units; binary noise below 1e-6 of a minor unit is ignored"""
+    scaled = np.round(np.asarray(amounts, dtype=np.float64) * minor_units, 6)
+    # The split below counts in millionths of a minor unit, which must fit in int64
+    if np.abs(scaled).max(initial=0) > _INT64_MAX // 10 ** 6:
+        raise OverflowError("Amount too large to convert to int64 minor units")
+    whole = np.floor(scaled)
+    # Re-express the fractional part in millionths so divide_rounded applies the mode exactly
+    millionths = whole.astype(np.int64) * 10 ** 6 + np.round((scaled - whole) * 10 ** 6).astype(np.int64)
+    return divide_rounded(millionths, 10 ** 6, mode)
+
+
+def from_minor(minor, minor_units=100):
+    return np.asarray(minor, dtype=np.int64) / minor_units
+
+
+def exact_sum(minor):
+    """Sum of int64 minor units as a Python int, never wrapping"""
+    minor = np.asarray(minor, dtype=np.int64)
+    if minor.size == 0:
+        return 0
+    if int(np.abs(minor).max()) <= _INT64_MAX // minor.size:
+        return int(minor.sum())
+    return sum(int(chunk.sum()) for chunk in np.array_split(minor, max(1, minor.size // 1024)))
+
+
+class MoneyEngine:
+    """FundManager commissions and carry in int64 minor units.
+
+    Fees and carry round with their own modes; compounded balances round
+    with `balance_rounding` once per year. Inputs are int64 minor units
+    unless a method says otherwise.
+    """
+    def __init__(self, fund_manager, minor_units=100, fee_rounding='half_even', carry_rounding='half_even',
+                 balance_rounding='half_even'):
+        for mode in (fee_rounding, carry_rounding, balance_rounding):
+            if mode not in ROUNDING_MODES:
+                raise ValueError(f"Unknown rounding mode {mode!r}; expected one of {ROUNDING_MODES}")
+        self.fund_manager = fund_manager
+        self.minor_units = minor_units
+        self.fee_rounding = fee_rounding
+        self.carry_rounding = carry_rounding
+        self.balance_rounding = balance_rounding
+
+    def to_minor(self, amounts):
+        return to_minor(amounts, self.minor_units, self.balance_rounding)
+
+    def from_minor(self, minor):
+        return from_minor(minor, self.minor_units)
+
+    def carry_numerators(self, amounts_minor, client_id=None):
+        """Carry rate numerators over RATE_SCALE, plus the float rates, for each amount"""
+        table = self.fund_manager.get_tier_table(client_id)
+        tiers = table.tier_indices(self.from_minor(amounts_minor))
+        return rate_ratio(table.rates)[tiers], table.rates[tiers]
+
+    def commissions(self, amounts_minor, commission='standard'):
+        rate = self.fund_manager.commission_rates[commission]
+        return multiply_rate(amounts_minor, rate, self.fee_rounding)
+
+    def balances(self, amounts_minor, years=4, annual_return=0.12):
+        """Year-end balances, rounded each year: shape (positions, years)"""
+        balance = np.asarray(amounts_minor, dtype=np.int64)
+        # Year-major storage writes each year contiguously; the result is a (positions, years) view
+        columns = np.empty((years,) + balance.shape, dtype=np.int64)
+        for year in range(years):
+            balance = columns[year] = multiply_rate(balance, 1 + annual_return, self.balance_rounding)
+        return np.moveaxis(columns, 0, -1)
+
+    def project_returns(self, amounts_minor, years=4, annual_return=0.12, client_id=None):
+        """project_returns_batch in minor units: carry on each year-end balance"""
+        amounts_minor = np.asarray(amounts_minor, dtype=np.int64)
+        numerators, carry_rates = self.carry_numerators(amounts_minor, client_id)
+        balances = self.balances(amounts_minor, years, annual_return)
+        yearly = multiply_ratio(balances, numerators[:, None], self.carry_rounding)
+        return {
+            'yearly_returns': yearly,
+            'total_return': yearly.sum(axis=1),
+            'carry_rate': carry_rates
+        }
+
+    def cohort_carry(self, intake_minor, years=3, annual_return=0.12, client_id=None):
+        """CohortEngine carry in minor units: tier rate on cumulative profit at each anniversary"""
+        intake_minor = np.asarray(intake_minor, dtype=np.int64)
+        numerators = self.carry_numerators(intake_minor, client_id)[0]
+        profit = self.balances(intake_minor, years, annual_return) - intake_minor[..., None]
+        return multiply_ratio(profit, numerators[..., None], self.carry_rounding)
+
+    def reconcile(self, expected, actual, tolerance=0):
+        """Position-by-position and total check of two minor-unit arrays.
+
+        Floats are taken as major units and converted first. Totals are
+        exact integers, so a million-position book balances to the cent.
+        """
+        expected, actual = (
+            self.to_minor(values) if np.asarray(values).dtype.kind == 'f' else np.asarray(values, dtype=np.int64)
+            for values in (expected, actual)
+        )
+        difference = actual - expected
+        mismatched = np.flatnonzero(np.abs(difference) > tolerance)
+        expected_total = exact_sum(expected)
+        actual_total = exact_sum(actual)
+        return {
+            'positions': expected.size,
+            'expected_total': expected_total,
+            'actual_total': actual_total,
+            'difference': actual_total - expected_total,
+            'mismatches': mismatched.size,
+            'mismatch_index': mismatched,
+            'balanced': mismatched.size == 0 and abs(actual_total - expected_total) <= tolerance
+        }
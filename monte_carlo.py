@@ -0,0 +1,60 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+# Paths are drawn in fixed-size chunks, each with its own child seed, so a
+# given seed produces the same paths whatever the worker count.
+CHUNK_PATHS = 250000
+
+
+def simulate_chunk(args):
+    """Simulate one chunk of return paths and the carry they generate"""
+    seed_seq, n_paths, investment, carry_rate, years, mean_return, volatility = args
+    rng = np.random.default_rng(seed_seq)
+
+    annual_returns = mean_return + volatility * rng.standard_normal((n_paths, years))
+    np.maximum(annual_returns, -0.99, out=annual_returns)
+
+    # Same economics as FundManager.project_returns, with realised compounding
+    growth = np.cumprod(1 + annual_returns, axis=1)
+    total_carry = investment * carry_rate * growth.sum(axis=1)
+    annualized_return = growth[:, -1] ** (1 / years) - 1
+
+    return annualized_return, total_carry
+
+
+def run_monte_carlo(investment, carry_rate, years=4, mean_return=0.12, volatility=0.082,
+                    n_paths=10000, seed=42, workers=1):
+    """Monte Carlo over stochastic annual returns, summarised for the analytics panel"""
+    if n_paths < 1:
+        raise ValueError(f"n_paths must be at least 1, got {n_paths}")
+    n_chunks = -(-n_paths // CHUNK_PATHS)
+    chunk_sizes = [CHUNK_PATHS] * (n_chunks - 1) + [n_paths - CHUNK_PATHS * (n_chunks - 1)]
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    tasks = [
+        (seed_seq, size, investment, carry_rate, years, mean_return, volatility)
+        for seed_seq, size in zip(seeds, chunk_sizes)
+    ]
+
+    if workers > 1 and n_chunks > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(simulate_chunk, tasks))
+    else:
+        results = [simulate_chunk(task) for task in tasks]
+
+    annualized_return = np.concatenate([result[0] for result in results])
+    total_carry = np.concatenate([result[1] for result in results])
+
+    ci_low, ci_high = np.percentile(annualized_return, [2.5, 97.5])
+    expected_carry = total_carry.mean()
+    carry_5th = np.percentile(total_carry, 5)
+
+    return {
+        'n_paths': n_paths,
+        'years': years,
+        'investment': investment,
+        'ci_95': (float(ci_low), float(ci_high)),
+        'probability_of_loss': float((annualized_return < 0).mean()),
+        'expected_value': float(expected_carry),
+        'value_at_risk_5': float(expected_carry - carry_5th),
+        'mean_annual_return': float(annualized_return.mean())
+    }
@@ -0,0 +1,183 @@
+"""Single-pass NAV statistics: drawdown, volatility and Sharpe.
+
+NavStatistics keeps O(window) state however long the series is, so years
+of minute-level ticks can be streamed from a generator or a chunked file.
+Ticks can arrive one at a time (update) or as arrays (update_many); both
+paths leave identical state.
+"""
+import math
+
+import numpy as np
+
+
+class NavStatistics:
+    """Running peak/drawdown, Welford return moments and a rolling window of returns"""
+    def __init__(self, window=720, periods_per_year=8760, risk_free_rate=0.0):
+        self.window = window
+        self.periods_per_year = periods_per_year
+        self.risk_free_rate = risk_free_rate
+        self.ticks = 0
+        self.last_nav = None
+        self.peak = None
+        self.max_drawdown = 0.0
+        # Whole-series return moments (Welford)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        # Rolling window: ring buffer plus its running mean and M2
+        self._ring = np.zeros(window)
+        self._ring_pos = 0
+        self.rolling_count = 0
+        self.rolling_mean = 0.0
+        self.rolling_m2 = 0.0
+
+    def update(self, nav):
+        """Consume one NAV tick in O(1)"""
+        nav = float(nav)
+        self.ticks += 1
+        if self.peak is None or nav > self.peak:
+            self.peak = nav
+        drawdown = 1 - nav / self.peak
+        if drawdown > self.max_drawdown:
+            self.max_drawdown = drawdown
+
+        if self.last_nav is not None:
+            self._add_return(nav / self.last_nav - 1)
+        self.last_nav = nav
+
+    def _add_return(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+        if self.rolling_count < self.window:
+            self.rolling_count += 1
+            delta = value - self.rolling_mean
+            self.rolling_mean += delta / self.rolling_count
+            self.rolling_m2 += delta * (value - self.rolling_mean)
+        else:
+            # Slide: swap the oldest return for the new one without a rescan
+            old = self._ring[self._ring_pos]
+            old_mean = self.rolling_mean
+            self.rolling_mean += (value - old) / self.window
+            self.rolling_m2 += (value - old) * (value - self.rolling_mean + old - old_mean)
+            self.rolling_m2 = max(self.rolling_m2, 0.0)
+        self._ring[self._ring_pos] = value
+        self._ring_pos = (self._ring_pos + 1) % self.window
+
+    def update_many(self, navs):
+        """Consume an array of NAV ticks with vectorized per-chunk work"""
+        navs = np.asarray(navs, dtype=np.float64).ravel()
+        if len(navs) == 0:
+            return
+        self.ticks += len(navs)
+
+        peaks = np.maximum.accumulate(navs)
+        if self.peak is not None:
+            np.maximum(peaks, self.peak, out=peaks)
+        self.max_drawdown = max(self.max_drawdown, float((1 - navs / peaks).max()))
+        self.peak = float(peaks[-1])
+
+        previous = navs[:-1] if self.last_nav is None else np.concatenate(([self.last_nav], navs[:-1]))
+        returns = (navs if self.last_nav is not None else navs[1:]) / previous - 1
+        self.last_nav = float(navs[-1])
+        if len(returns) == 0:
+            return
+
+        # Chan et al. merge of the chunk's moments into the running ones
+        n = len(returns)
+        chunk_mean = float(returns.mean())
+        chunk_m2 = float(((returns - chunk_mean) ** 2).sum())
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += chunk_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+        recent = np.concatenate((self.window_returns(), returns))[-self.window:]
+        self._ring[:len(recent)] = recent
+        self._ring_pos = len(recent) % self.window
+        self.rolling_count = len(recent)
+        self.rolling_mean = float(recent.mean())
+        self.rolling_m2 = float(((recent - self.rolling_mean) ** 2).sum())
+
+    def consume(self, source):
+        """Consume an iterable of NAV scalars and/or arrays (e.g. a generator of file chunks)"""
+        for item in source:
+            if np.ndim(item) == 0:
+                self.update(item)
+            else:
+                self.update_many(item)
+        return self
+
+    def window_returns(self):
+        """Returns in the rolling window, oldest first"""
+        if self.rolling_count < self.window:
+            return self._ring[:self.rolling_count].copy()
+        return np.roll(self._ring, -self._ring_pos)
+
+    @property
+    def current_drawdown(self):
+        return 1 - self.last_nav / self.peak if self.peak else 0.0
+
+    def _annualize(self, mean, m2, count):
+        if count < 2:
+            return math.nan, math.nan
+        volatility = math.sqrt(m2 / (count - 1) * self.periods_per_year)
+        annual_return = mean * self.periods_per_year
+        sharpe = (annual_return - self.risk_free_rate) / volatility if volatility > 0 else math.nan
+        return volatility, sharpe
+
+    @property
+    def volatility(self):
+        """Annualized volatility of per-tick returns over the whole series"""
+        return self._annualize(self.mean, self.m2, self.count)[0]
+
+    @property
+    def sharpe(self):
+        return self._annualize(self.mean, self.m2, self.count)[1]
+
+    @property
+    def rolling_volatility(self):
+        return self._annualize(self.rolling_mean, self.rolling_m2, self.rolling_count)[0]
+
+    @property
+    def rolling_sharpe(self):
+        return self._annualize(self.rolling_mean, self.rolling_m2, self.rolling_count)[1]
+
+    def summary(self):
+        return {
+            'ticks': self.ticks,
+            'annual_return': self.mean * self.periods_per_year,
+            'volatility': self.volatility,
+            'sharpe': self.sharpe,
+            'rolling_volatility': self.rolling_volatility,
+            'rolling_sharpe': self.rolling_sharpe,
+            'max_drawdown': self.max_drawdown,
+            'current_drawdown': self.current_drawdown
+        }
+
+
+def nav_chunks_from_csv(path, column='nav', chunksize=1000000):
+    """Stream a NAV column from a CSV file as float64 arrays"""
+    import pandas as pd
+
+    for chunk in pd.read_csv(path, usecols=[column], chunksize=chunksize):
+        yield chunk[column].to_numpy(dtype=np.float64)
+
+
+def simulated_nav_chunks(years=4, periods_per_year=8760, annual_return=0.12, volatility=0.082,
+                         start_nav=1.0, seed=42, chunksize=100000):
+    """Seeded geometric random-walk NAV ticks, generated chunk by chunk"""
+    rng = np.random.default_rng(seed)
+    drift = annual_return / periods_per_year
+    scale = volatility / math.sqrt(periods_per_year)
+    remaining = years * periods_per_year
+    nav = start_nav
+    while remaining > 0:
+        size = min(chunksize, remaining)
+        path = nav * np.cumprod(1 + drift + scale * rng.standard_normal(size))
+        nav = path[-1]
+        remaining -= size
+        yield path
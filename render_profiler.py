@@ -0,0 +1,131 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+import weakref
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+PROFILE_ENV = 'DEFI_RENDER_PROFILE'
+PROFILE_LOG_ENV = 'DEFI_RENDER_PROFILE_LOG'
+DEFAULT_LOG = 'render_profile.jsonl'
+
+# Profiled runs currently holding tracemalloc on; the last one out stops it
+_tracing_lock = threading.Lock()
+_tracing_runs = 0
+
+
+def _acquire_tracing():
+    """Count one more profiled run, starting tracemalloc if nobody has it on; False if it was on already
+    outside the profiler"""
+    global _tracing_runs
+    with _tracing_lock:
+        if _tracing_runs == 0 and tracemalloc.is_tracing():
+            return False
+        if _tracing_runs == 0:
+            tracemalloc.start()
+        _tracing_runs += 1
+        return True
+
+
+def _release_tracing():
+    global _tracing_runs
+    with _tracing_lock:
+        _tracing_runs -= 1
+        if _tracing_runs == 0:
+            tracemalloc.stop()
+
+
+class RenderProfiler:
+    """Opt-in wall/CPU/allocation timing for the sections of one script run.
+
+    Sections nest: begin()/end() for page-level blocks, section() as a
+    context manager for everything else. Allocation figures come from
+    tracemalloc, which is process-wide, so concurrent sessions blur them.
+    Tracing runs only while at least one profiled run is in progress and
+    stops at the last flush(), so other reruns do not pay for it. When
+    disabled every call is a no-op.
+    """
+    def __init__(self, enabled=False, page=None, log_path=None):
+        self.enabled = enabled
+        self.page = page
+        self.log_path = log_path
+        self.run_id = uuid.uuid4().hex[:12]
+        self.records = []
+        self._stack = []
+        # Released at flush(), or when an interrupted rerun drops the profiler without flushing
+        self._release = weakref.finalize(self, _release_tracing) if enabled and _acquire_tracing() else None
+
+    @classmethod
+    def from_environment(cls, query_params=None, page=None):
+        """Enabled by DEFI_RENDER_PROFILE=1 or a ?profile=1 query parameter"""
+        from_query = query_params is not None and query_params.get('profile') == '1'
+        enabled = os.environ.get(PROFILE_ENV) == '1' or from_query
+        return cls(enabled=enabled, page=page, log_path=os.environ.get(PROFILE_LOG_ENV, DEFAULT_LOG))
+
+    def begin(self, name):
+        if not self.enabled:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        if self._stack:
+            # The parent's peak so far survives the reset below
+            parent = self._stack[-1]
+            parent['peak'] = max(parent['peak'], peak)
+        tracemalloc.reset_peak()
+        self._stack.append({
+            'name': name,
+            'order': len(self.records) + len(self._stack),
+            'wall': time.perf_counter(),
+            'cpu': time.thread_time(),
+            'memory': current,
+            'peak': current
+        })
+
+    def end(self):
+        if not self.enabled:
+            return
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        current, peak = tracemalloc.get_traced_memory()
+        frame = self._stack.pop()
+        peak = max(frame['peak'], peak)
+        if self._stack:
+            parent = self._stack[-1]
+            parent['peak'] = max(parent['peak'], peak)
+
+        self.records.append({
+            'order': frame['order'],
+            'section': '/'.join([entry['name'] for entry in self._stack] + [frame['name']]),
+            'depth': len(self._stack),
+            'wall_ms': (wall - frame['wall']) * 1000,
+            'cpu_ms': (cpu - frame['cpu']) * 1000,
+            'alloc_bytes': current - frame['memory'],
+            'peak_bytes': peak - frame['memory']
+        })
+
+    @contextmanager
+    def section(self, name):
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end()
+
+    def breakdown(self):
+        """Finished sections in the order they started"""
+        return sorted(self.records, key=lambda record: record['order'])
+
+    def flush(self):
+        """Append this run's sections to the JSON-lines log and release tracing"""
+        if self._release is not None:
+            self._release()
+        if not self.enabled or not self.log_path or not self.records:
+            return
+        timestamp = datetime.now(timezone.utc).isoformat()
+        with open(self.log_path, 'a', encoding='utf-8') as handle:
+            for record in self.breakdown():
+                entry = {'ts': timestamp, 'run': self.run_id, 'page': self.page}
+                entry.update({key: value for key, value in record.items() if key != 'order'})
+                handle.write(json.dumps(entry) + '\n')
@@ -0,0 +1,149 @@
+"""One read-mostly FundManager/RiskManager per process, with per-session overrides.
+
+SharedEngine holds the heavy state (compiled tier tables, limits and a
+bounded LRU of derived results such as sensitivity grids) once per
+process. Each browser session gets an EngineSession: a few references
+that read straight through to the shared managers until the session
+overrides something, at which point only that session gets its own
+shallow copy (copy-on-write). Sessions with identical overrides share
+cache entries.
+"""
+import copy
+import threading
+from collections import OrderedDict
+
+from fund_engine import FundManager, RiskManager
+
+# FundManager attributes holding dicts that a copy must not share with the original
+_FUND_DICTS = ('carry_tiers', 'commission_rates', 'client_carry_tiers', 'client_tier_tables')
+
+
+class SharedEngine:
+    """Process-wide managers plus an LRU of derived results, safe to share across sessions.
+
+    The shared managers must be treated as read-only; change settings
+    through EngineSession so other sessions are unaffected.
+    """
+    def __init__(self, maxsize=32):
+        self.fund_manager = FundManager()
+        self.risk_manager = RiskManager()
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def session(self):
+        return EngineSession(self)
+
+    def get_or_build(self, key, build):
+        """Cached result for `key` (any hashable), calling `build()` only on a miss"""
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return self._results[key]
+
+        result = build()
+        with self._lock:
+            self.misses += 1
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._results),
+                'maxsize': self.maxsize
+            }
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+
+
+class EngineSession:
+    """A session's view of a SharedEngine; copies a manager only when overriding it"""
+    def __init__(self, engine):
+        self.engine = engine
+        self.overrides = {}
+        self._fund_manager = None
+        self._risk_manager = None
+
+    @property
+    def fund_manager(self):
+        return self._fund_manager or self.engine.fund_manager
+
+    @property
+    def risk_manager(self):
+        return self._risk_manager or self.engine.risk_manager
+
+    @property
+    def is_shared(self):
+        return self._fund_manager is None and self._risk_manager is None
+
+    def _own_fund_manager(self):
+        if self._fund_manager is None:
+            fund_manager = copy.copy(self.engine.fund_manager)
+            for name in _FUND_DICTS:
+                setattr(fund_manager, name, dict(getattr(fund_manager, name)))
+            self._fund_manager = fund_manager
+        return self._fund_manager
+
+    def override(self, **settings):
+        """Set FundManager attributes (e.g. max_monthly_intake, carry_tiers) for this session only"""
+        fund_manager = self._own_fund_manager()
+        for name, value in settings.items():
+            if not hasattr(fund_manager, name):
+                raise AttributeError(f"FundManager has no setting {name!r}")
+            setattr(fund_manager, name, copy.deepcopy(value))
+            self.overrides[name] = value
+        if 'carry_tiers' in settings or 'client_carry_tiers' in settings:
+            fund_manager.compile_tiers()
+
+    def set_client_tiers(self, client_id, carry_tiers):
+        """FundManager.set_client_tiers for this session only"""
+        self._own_fund_manager().set_client_tiers(client_id, copy.deepcopy(carry_tiers))
+        self.overrides[('client_tiers', client_id)] = carry_tiers
+
+    def override_limits(self, **limits):
+        """Set RiskManager.risk_limits entries for this session only"""
+        unknown = set(limits) - set(self.engine.risk_manager.risk_limits)
+        if unknown:
+            raise KeyError(f"Unknown risk limits: {sorted(unknown)}")
+        if self._risk_manager is None:
+            self._risk_manager = copy.copy(self.engine.risk_manager)
+            self._risk_manager.risk_limits = dict(self._risk_manager.risk_limits)
+        self._risk_manager.risk_limits.update(limits)
+        self.overrides.update({('limit', name): value for name, value in limits.items()})
+
+    def reset(self):
+        """Drop every override and read the shared managers again"""
+        self.overrides = {}
+        self._fund_manager = None
+        self._risk_manager = None
+
+    @property
+    def cache_key(self):
+        """Identifies the effective settings; None for sessions on the shared defaults"""
+        if not self.overrides:
+            return None
+        return repr(sorted(self.overrides.items(), key=lambda item: repr(item[0])))
+
+    def get_or_build(self, name, args, build):
+        """Engine-cached `build(fund_manager)` for this session's settings"""
+        return self.engine.get_or_build((self.cache_key, name, args), lambda: build(self.fund_manager))
+
+    def sensitivity_grid(self, amounts, annual_returns, horizons, client_id=None):
+        """FundManager.sensitivity_grid, built once per distinct settings and grid axes"""
+        args = (tuple(amounts), tuple(annual_returns), tuple(horizons), client_id)
+        return self.get_or_build('sensitivity_grid', args, lambda fund_manager: fund_manager.sensitivity_grid(
+            amounts, annual_returns, horizons, client_id))
@@ -0,0 +1,138 @@
+import csv
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SPREADSHEET_CSV = Path(__file__).with_name('Calculator-Spreadsheet-_1_.csv')
+SPREADSHEET_XLSX = Path(__file__).with_name('Calculator Spreadsheet.xlsx')
+CACHE_DIR = Path(__file__).with_name('.spreadsheet_cache')
+
+BLOCKS = ('carry_brackets', 'running_totals', 'monthly_setup')
+
+RUNNING_TOTAL_COLUMNS = ['Invested_Capital', 'Commission', 'Carry_Y1', 'Carry_Y2', 'Carry_Y3',
+                         'Three_Year_Take', 'Running_Total']
+MONTHLY_COLUMNS = ['Amount_Funded', 'Fee_Rate', 'Commission', 'Carry_Y1', 'Carry_Y2', 'Carry_Y3']
+
+
+def file_hash(path):
+    """Content hash used to key the on-disk cache"""
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()[:16]
+
+
+def read_grid(path):
+    """Read the free-form sheet as a list of rows of cell strings"""
+    path = Path(path)
+    if path.suffix.lower() in ('.xlsx', '.xls'):
+        frame = pd.read_excel(path, header=None, dtype=object)
+        return [['' if pd.isna(cell) else str(cell) for cell in row] for row in frame.itertuples(index=False)]
+    with open(path, newline='', encoding='utf-8') as handle:
+        return list(csv.reader(handle))
+
+
+def to_number(cell):
+    """Parse '$72,500', '10.00%', '0.01' style cells; NaN when blank"""
+    text = str(cell).strip().replace('$', '').replace(',', '')
+    if not text:
+        return np.nan
+    if text.endswith('%'):
+        return float(text[:-1]) / 100
+    return float(text)
+
+
+def _cell(row, col):
+    return row[col].strip() if col < len(row) else ''
+
+
+def _block_rows(grid, start, label_col):
+    """Rows below a header until the label column goes blank"""
+    rows = []
+    for row in grid[start + 1:]:
+        if not _cell(row, label_col):
+            break
+        rows.append(row)
+    return rows
+
+
+def parse_blocks(grid):
+    """Extract carry brackets, running-total setups and monthly setups from the sheet grid"""
+    carry_brackets, running_totals, monthly_setup = [], [], []
+    totals_block = monthly_block = 0
+
+    for index, row in enumerate(grid):
+        for col in range(len(row)):
+            header = _cell(row, col)
+            if header == 'CARRY' and _cell(row, col + 1) == 'from' and _cell(row, col + 2) == 'upto':
+                for data in _block_rows(grid, index, col):
+                    carry_brackets.append([to_number(_cell(data, col + offset)) for offset in range(3)])
+            elif header == 'Invested Capital' and _cell(row, col + 1) == 'Upfront':
+                for data in _block_rows(grid, index, col - 1):
+                    values = [to_number(_cell(data, col + offset)) for offset in range(len(RUNNING_TOTAL_COLUMNS))]
+                    running_totals.append([totals_block, _cell(data, col - 1)] + values)
+                totals_block += 1
+            elif header == 'Amount Funded':
+                for data in _block_rows(grid, index, col - 1):
+                    month = _cell(data, col - 1)
+                    values = [to_number(_cell(data, col + offset)) for offset in range(len(MONTHLY_COLUMNS))]
+                    monthly_setup.append([monthly_block, month, float(month.split()[-1])] + values)
+                monthly_block += 1
+
+    carry = pd.DataFrame(carry_brackets, columns=['Carry_Rate', 'From', 'Upto'])
+    totals = pd.DataFrame(running_totals, columns=['Block', 'Period'] + RUNNING_TOTAL_COLUMNS)
+    monthly = pd.DataFrame(monthly_setup, columns=['Block', 'Month', 'Month_Number'] + MONTHLY_COLUMNS)
+
+    totals = totals.astype({'Block': np.int8, 'Period': 'category'})
+    totals[RUNNING_TOTAL_COLUMNS] = totals[RUNNING_TOTAL_COLUMNS].astype(np.float64)
+    monthly = monthly.astype({'Block': np.int8, 'Month': 'category', 'Month_Number': np.float64})
+    monthly[MONTHLY_COLUMNS] = monthly[MONTHLY_COLUMNS].astype(np.float64)
+
+    return {
+        'carry_brackets': carry.astype(np.float64),
+        'running_totals': totals,
+        'monthly_setup': monthly
+    }
+
+
+def _write_atomic(frame, target):
+    """Write Parquet to a temp file beside `target`, then rename it into place"""
+    handle, temp = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix='.tmp')
+    os.close(handle)
+    try:
+        frame.to_parquet(temp, index=False)
+        os.replace(temp, target)
+    except BaseException:
+        Path(temp).unlink(missing_ok=True)
+        raise
+
+
+def load_spreadsheet(path=SPREADSHEET_CSV, cache_dir=CACHE_DIR):
+    """Parsed spreadsheet blocks, served from a Parquet cache keyed by file hash.
+
+    Cache files are written via temp file + rename, so readers never see a
+    partial file; an unreadable cache file is re-parsed and rewritten.
+    """
+    path = Path(path)
+    key = f"{path.stem}-{file_hash(path)}"
+    cache_files = {name: Path(cache_dir) / f"{key}-{name}.parquet" for name in BLOCKS}
+
+    try:
+        if all(cache_file.exists() for cache_file in cache_files.values()):
+            return {name: pd.read_parquet(cache_file) for name, cache_file in cache_files.items()}
+    except ImportError:
+        # No Parquet engine installed: parse every time instead of caching
+        return parse_blocks(read_grid(path))
+    except (OSError, ValueError):
+        # Corrupt or truncated cache file (pyarrow's ArrowInvalid is a ValueError): rebuild it
+        pass
+
+    blocks = parse_blocks(read_grid(path))
+    try:
+        Path(cache_dir).mkdir(exist_ok=True)
+        for name, frame in blocks.items():
+            _write_atomic(frame, cache_files[name])
+    except (ImportError, OSError):
+        pass
+    return blocks
@@ -0,0 +1,121 @@
+"""Background AUM/risk refresh for the dashboard's live status widgets.
+
+One StatusWorker runs per process (the dashboard holds it in
+st.cache_resource). Its thread recomputes the book through RiskManager
+and publishes each result as a new, never-mutated snapshot dict by
+swapping a single attribute, so reruns read `worker.snapshot` without a
+lock and never wait on a refresh.
+"""
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from fund_engine import PositionStore, _is_dataframe
+
+
+def csv_positions_source(path):
+    """Source callable reading `amount`/`liquidity` from a CSV, re-parsed only when the file changes"""
+    cache = {'mtime': None, 'store': None}
+
+    def read_positions():
+        import pandas as pd
+
+        mtime = os.path.getmtime(path)
+        if mtime != cache['mtime']:
+            cache['store'] = PositionStore.from_frame(pd.read_csv(path))
+            cache['mtime'] = mtime
+        return cache['store']
+    return read_positions
+
+
+_FIGURES = ('active_investments', 'total_aum', 'risk_score', 'risk_status', 'concentration',
+            'liquidity_ratio', 'recommendations', 'limits_checked', 'breached_limits')
+
+
+class StatusWorker:
+    """Daemon thread that refreshes a status snapshot every `interval` seconds.
+
+    `source` is a zero-argument callable returning the current book as a
+    PositionStore, a DataFrame with `amount`/`liquidity` columns or a list
+    of position dicts. A failed refresh republishes the last good figures
+    with `error` set, so the dashboard can flag a stale pipeline.
+    """
+    def __init__(self, risk_manager, source, interval=30.0):
+        self.risk_manager = risk_manager
+        self.source = source
+        self.interval = interval
+        self.snapshot = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh(self):
+        """Recompute and publish one snapshot; failures keep the last good figures"""
+        previous = self.snapshot
+        started = time.perf_counter()
+        try:
+            positions = self.source()
+            if _is_dataframe(positions):
+                positions = PositionStore.from_frame(positions)
+            elif not isinstance(positions, PositionStore):
+                positions = PositionStore.from_records(positions)
+            risk = self.risk_manager.assess_position_store(positions)
+            screen = self.risk_manager.check_limits({'concentration': [risk['concentration_risk']],
+                                                     'liquidity_ratio': [risk['liquidity_ratio']]})
+            figures = {
+                'active_investments': len(positions),
+                'total_aum': float(risk['total_aum']),
+                'risk_score': float(risk['overall_risk_score']),
+                'risk_status': risk['risk_status'],
+                'concentration': float(risk['concentration_risk']),
+                'liquidity_ratio': float(risk['liquidity_ratio']),
+                'recommendations': tuple(risk['recommendations']),
+                'limits_checked': int(screen['checked'].sum()),
+                'breached_limits': tuple(name for name, hit in zip(screen['limits'], screen['breaches'][0]) if hit),
+                'error': None
+            }
+        except Exception as exc:
+            if previous is None:
+                figures = {'active_investments': 0, 'total_aum': 0.0, 'risk_score': 0.0,
+                           'risk_status': 'Unavailable', 'concentration': 0.0, 'liquidity_ratio': 0.0,
+                           'recommendations': (), 'limits_checked': 0, 'breached_limits': ()}
+            else:
+                figures = {key: previous[key] for key in _FIGURES}
+            figures['error'] = f"{type(exc).__name__}: {exc}"
+
+        last = previous or figures
+        snapshot = dict(figures)
+        snapshot.update({
+            'version': previous['version'] + 1 if previous else 1,
+            'computed_at': datetime.now(timezone.utc),
+            'duration_ms': (time.perf_counter() - started) * 1000,
+            'new_investments': figures['active_investments'] - last['active_investments'],
+            'aum_change': figures['total_aum'] / last['total_aum'] - 1 if last['total_aum'] else 0.0
+        })
+        # Single reference swap: readers see either the old or the new snapshot, never a mix
+        self.snapshot = snapshot
+        return snapshot
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.refresh()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='status-worker', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def age_seconds(self):
+        """Seconds since the current snapshot was computed"""
+        if self.snapshot is None:
+            return float('inf')
+        return (datetime.now(timezone.utc) - self.snapshot['computed_at']).total_seconds()